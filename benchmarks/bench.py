@@ -0,0 +1,214 @@
+"""Benchmarks for the ssidshuffle hot paths, runnable without macOS.
+
+CoreWLAN is replaced by the in-memory 'fake' backend, and the 'airport', 'networksetup' and 'sw_vers'
+binaries are replaced by stand-in scripts that print pre-generated output, so the numbers cover the Python
+side of each path (plus process spawning for the subprocess based paths).
+
+Usage:
+    python3 benchmarks/bench.py [--sizes 10 100 1000 10000] [--repeat 5] [--output bench.json]
+                                [--compare previous.json]
+
+Results are written as JSON, to 'benchmarks/results-<timestamp>.json' unless '--output' is given; '--compare'
+prints the ratio of each result against a previous run."""
+import argparse
+import contextlib
+import io
+import json
+import platform
+import plistlib
+import statistics
+import sys
+import tempfile
+
+from datetime import datetime, timezone
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+from ssidlib.backends import set_backend  # NOQA: E402
+
+set_backend("fake")  # the models build their lookup tables from the backend when they are imported
+
+from ssidlib.backends.fake import FakeBackend  # NOQA: E402
+from ssidlib.corewlan import WLan  # NOQA: E402
+from ssidlib.utils import airport, networksetup, sysinfo  # NOQA: E402
+
+
+SIZES = [10, 100, 1000, 10000]
+STUB = """#!/bin/sh
+case "$*" in
+{cases}
+esac
+"""
+
+
+def _write_stub(path: Path, cases: Dict[str, str]) -> str:
+    """Write a stand-in shell script that runs the command matching the first pattern of its arguments.
+
+    :param path: path of the script to write
+    :param cases: mapping of shell 'case' patterns to the shell command to run"""
+    lines = "\n".join(f"  {pattern}) {command};;" for pattern, command in cases.items())
+    path.write_text(STUB.format(cases=lines))
+    path.chmod(0o755)
+    return str(path)
+
+
+def _scan_plist(size: int) -> bytes:
+    """Generate 'airport --scan --xml' output for 'size' networks."""
+    networks = [{"AP_MODE": 2,
+                 "BSSID": f"02:00:00:{n >> 16 & 255:02x}:{n >> 8 & 255:02x}:{n & 255:02x}",
+                 "CHANNEL": [1, 6, 11, 36, 44, 149][n % 6],
+                 "NOISE": -92,
+                 "RSSI": -30 - n % 60,
+                 "SSID": f"Network-{n:05d}".encode("utf-8"),
+                 "80211D_IE": {"IE_KEY_80211D_COUNTRY_CODE": "US"},
+                 "HT_IE": {"HT_SECONDARY_CHAN_OFFSET": n % 2},
+                 "IE": bytes(256)} for n in range(size)]
+    return plistlib.dumps(networks)
+
+
+def _getinfo_output(directory: Path) -> Path:
+    """Write 'airport --getinfo' output."""
+    text = ("     agrCtlRSSI: -52\n     agrExtRSSI: 0\n    agrCtlNoise: -92\n    agrExtNoise: 0\n"
+            "          state: running\n        op mode: station \n     lastTxRate: 866\n        maxRate: 867\n"
+            "lastAssocStatus: 0\n    802.11 auth: open\n      link auth: wpa2-psk\n          BSSID: 2:0:0:0:0:1\n"
+            "           SSID: Network-00000\n            MCS: 9\n  guardInterval: 800\n            NSS: 2\n"
+            "        channel: 149,80\n")
+    (directory / "getinfo.txt").write_text(text)
+    return directory / "getinfo.txt"
+
+
+def _stubs(directory: Path, size: int) -> None:
+    """Point the 'airport', 'networksetup' and 'sw_vers' paths at stand-in scripts for 'size' networks."""
+    (directory / "scan.xml").write_bytes(_scan_plist(size))
+    (directory / "sw_vers.txt").write_text("ProductName:\t\tmacOS\nProductVersion:\t\t13.0.1\n"
+                                           "BuildVersion:\t\t22A400\n")
+    getinfo = _getinfo_output(directory)
+    airport.AIRPORT = _write_stub(directory / "airport", {"*--scan*": f"cat '{directory / 'scan.xml'}'",
+                                                          "*--getinfo*": f"cat '{getinfo}'"})
+    networksetup.NETWORKSETUP = _write_stub(directory / "networksetup",
+                                            {"-addpreferredwirelessnetworkatindex*": 'echo "Added $3 to list"',
+                                             "-remove*": 'echo "Removed $3 from list"'})
+    sysinfo.SW_VERS = _write_stub(directory / "sw_vers", {"*": f"cat '{directory / 'sw_vers.txt'}'"})
+
+
+def _time(func: Callable, repeat: int) -> Dict[str, Any]:
+    """Time 'func' 'repeat' times; output written to stdout by 'func' is discarded."""
+    samples = list()
+    error = None
+
+    for _ in range(repeat):
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                start = perf_counter()
+                func()
+                samples.append(perf_counter() - start)
+        except (Exception, SystemExit) as e:
+            error = f"{type(e).__name__}: {e}"
+            break
+
+    result = {"repeat": len(samples), "error": error}
+
+    if samples:
+        result.update({"min": min(samples), "mean": statistics.fmean(samples), "median": statistics.median(samples)})
+
+    return result
+
+
+def _benchmarks(size: int) -> Dict[str, Callable]:
+    """Return the benchmarks for 'size' saved network profiles and scan results; each benchmark that
+    changes the configuration gets its own fake backend."""
+    wlan = WLan(backend=FakeBackend(profiles=size, networks=size))
+    move_last_to_top = [wlan.interface.profile_index.ssids[-1]]
+
+    def reorder():
+        wlan.refresh()
+        wlan.reorder(move_last_to_top)
+
+    def current_ssid_order():
+        wlan.refresh()
+        wlan.current_ssid_order(output=io.StringIO())
+
+    def commit(use_networksetup: bool, reverse: bool = False) -> Callable:
+        committer = WLan(backend=FakeBackend(profiles=size, networks=size))
+
+        def func():
+            ssids = committer.interface.profile_index.ssids
+            new_order = list(reversed(ssids)) if reverse else [ssids[-1]]
+            # The stand-in 'networksetup' does not change the fake configuration, so there is nothing to verify
+            committer.commit(new_order=committer.reorder(new_order),
+                             use_networksetup=use_networksetup,
+                             verify=not use_networksetup)
+
+        return func
+
+    return {"reorder": reorder,
+            "current_ssid_order": current_ssid_order,
+            "commit_corewlan": commit(use_networksetup=False),
+            "commit_corewlan_reverse": commit(use_networksetup=False, reverse=True),
+            "commit_networksetup": commit(use_networksetup=True),
+            "airport_getinfo": lambda: airport._airport_getinfo(max_age=0),
+            "native_getinfo": lambda: wlan.interface.settings,
+            "airport_scan": airport.scan,
+            "airport_iter_scan_first": lambda: next(airport.iter_scan(limit=1), None),
+            "sysinfo_sw_vers": sysinfo._sw_vers}
+
+
+def run(sizes: List[int], repeat: int) -> Dict[str, Any]:
+    """Run all benchmarks for each size."""
+    results = list()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            _stubs(Path(tmp), size)
+
+            for name, func in _benchmarks(size).items():
+                result = {"name": name, "size": size, **_time(func, repeat)}
+                results.append(result)
+                timing = f"{result['median'] * 1000:10.3f}ms" if "median" in result else result["error"]
+                print(f"{name:>30} {size:>6}: {timing}", file=sys.stderr)
+
+    return {"created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results}
+
+
+def compare(current: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Print the ratio of the median of each result against the same result from a previous run."""
+    old = {(r["name"], r["size"]): r for r in previous["results"]}
+
+    for result in current["results"]:
+        prior = old.get((result["name"], result["size"]))
+
+        if prior and prior.get("median") and result.get("median"):
+            print(f"{result['name']:>30} {result['size']:>6}: {result['median'] / prior['median']:6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the ssidshuffle hot paths with stubbed CoreWLAN.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES, help="profile and scan result counts")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed runs per benchmark")
+    parser.add_argument("--output",
+                        help="path to write the JSON results to (default: 'benchmarks/results-<timestamp>.json')")
+    parser.add_argument("--compare", help="path of previous JSON results to compare against")
+    args = parser.parse_args()
+
+    results = run(sizes=args.sizes, repeat=args.repeat)
+    timestamp = datetime.fromisoformat(results["created"]).strftime("%Y%m%dT%H%M%SZ")
+    output = args.output or Path(__file__).resolve().parent / f"results-{timestamp}.json"
+
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"Results written to {output}", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
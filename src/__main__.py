@@ -26,17 +26,18 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE."""
 import argparse
+import multiprocessing
 import sys
 
+from dataclasses import asdict
 from os import geteuid
+from typing import Any
 # from ssidlib.airport import WiFiAdapter
-from ssidlib.corewlan import WLan
-from ssidlib.utils.pyobjc import o2p
-from ssidlib.utils.sysinfo import major_os_version
 
 
 NAME = "ssidshuffle"  # for custom arg errors
 VERSION = "1.0.20221023"
+BANDS = ["2.4GHz", "5GHz"]  # as in 'ssidlib/utils/ordering.py', which is not imported to build the arguments
 
 
 def _print_arg_err(msg: str, parser: argparse.Namespace, returncode: int = 1) -> None:
@@ -51,13 +52,13 @@ def _print_arg_err(msg: str, parser: argparse.Namespace, returncode: int = 1) ->
 
 
 def _arguments() -> None:
-    """Construct command line arguments."""
-    w = WLan()
-    iface = w.interface.name
-    valid_interfaces = w.valid_interfaces
-
+    """Construct command line arguments.
+    Note: the wireless interface (and the CoreWLAN framework) is only loaded once all argument checks
+          that do not need it have passed, so '--help', '--version', and argument errors stay fast."""
     parser = argparse.ArgumentParser(description=("A command line utility to quickly re-order "
                                                   "SSIDs for a specific wireless network interface."),
+                                     epilog=("use 'plan' as the first argument to plan a new SSID order over\n"
+                                             "exported profile lists offline, see 'plan --help'"),
                                      formatter_class=argparse.RawTextHelpFormatter)
     a = parser.add_argument
     e = parser.add_mutually_exclusive_group().add_argument
@@ -74,6 +75,14 @@ def _arguments() -> None:
       help="list current SSIDs for the interface",
       required=False)
 
+    e("--dump",
+      action="store_true",
+      dest="dump",
+      help=("show the state of the wireless interface (channel, PHY mode,\n"
+            "security, addresses) and its SSIDs; all wireless interfaces\n"
+            "are shown unless '-i, --interface' is supplied"),
+      required=False)
+
     e("-s, --ssids",
       nargs="*",
       dest="ssids",
@@ -89,25 +98,123 @@ def _arguments() -> None:
             "if auto-join is not desired"),
       required=False)
 
+    e("--order-by",
+      dest="order_by",
+      choices=["rssi"],
+      help=("automatically re-shuffle SSIDs using the results of one network\n"
+            "scan: 'rssi' ranks SSIDs by signal strength, with a bonus for\n"
+            "the band set with '--prefer-band'; SSIDs not found in the scan\n"
+            "keep their current order after the SSIDs that were found"),
+      required=False)
+
+    e("--policy",
+      dest="policy",
+      metavar="[file]",
+      help=("apply the SSID order rules in a policy file (JSON or plist) to\n"
+            "each wireless interface in one run; rules are given per\n"
+            "interface name under 'interfaces', with an optional 'default'\n"
+            "rule, each rule either has 'ssids' or 'order_by'; use with\n"
+            "'-i, --interface' to only apply the rule for that interface"),
+      required=False)
+
+    a("--prefer-band",
+      dest="prefer_band",
+      type=lambda value: next((band for band in BANDS if band.lower() == value.lower()), value),
+      choices=BANDS,
+      default="5GHz",
+      help="the channel band preferred by '--order-by', in any case (default: '5GHz')",
+      required=False)
+
+    a("--band-bonus",
+      dest="band_bonus",
+      type=int,
+      default=10,
+      metavar="[dB]",
+      help=("the bonus (in dB) added to the RSSI of networks in the\n"
+            "'--prefer-band' channel band by '--order-by' (default: 10)"),
+      required=False)
+
+    a("--format",
+      dest="format",
+      choices=["text", "json", "plist", "ndjson"],
+      default="text",
+      help=("the output format of '-l, --list-current', '--dump', and\n"
+            "'-n, --dry-run' (default: 'text'); 'ndjson' writes one JSON\n"
+            "object per line, for example one per SSID for '-l'"),
+      required=False)
+
     a("-i", "--interface",
       dest="interface",
       metavar="[interface]",
-      help=(f"the wireless network interface, for example: {iface!r}; defaults\n"
-            f"to the current wirless interface ({iface!r}) when this argument is not\n"
+      help=("the wireless network interface, for example: 'en1'; defaults\n"
+            "to the current wirless interface when this argument is not\n"
             "supplied"),
       required=False)
 
     a("--power-cycle",
       action="store_true",
       dest="power_cycle",
-      help=("power cycles the wireless interface with a 5 second wait\n"
-            "between off/on states"),
+      help=("power cycles the wireless interface, waiting for it to report\n"
+            "the power off, the power on, and then to re-associate and get an\n"
+            "IP address (if it was associated before)"),
+      required=False)
+
+    a("--power-cycle-timeout",
+      dest="power_cycle_timeout",
+      type=float,
+      default=30,
+      metavar="[seconds]",
+      help=("with '--power-cycle', the number of seconds the interface has\n"
+            "to come back in (default: 30)"),
+      required=False)
+
+    a("--watch",
+      action="store_true",
+      dest="watch",
+      help=("keep running and re-apply the '-s, --ssids' or '--order-by'\n"
+            "order whenever the wireless network changes (SSID, link, or\n"
+            "scan results), instead of applying it once"),
+      required=False)
+
+    a("--debounce",
+      dest="debounce",
+      type=float,
+      default=2,
+      metavar="[seconds]",
+      help=("with '--watch', wait until there have been no wireless events\n"
+            "for this many seconds before re-applying the order (default: 2)"),
+      required=False)
+
+    a("--watch-interval",
+      dest="watch_interval",
+      type=float,
+      metavar="[seconds]",
+      help=("with '--watch', also check the order after this many seconds\n"
+            "without any wireless events"),
+      required=False)
+
+    a("--force",
+      action="store_true",
+      dest="force",
+      help=("apply the '-s, --ssids' (or '--policy') order even if the last\n"
+            "run recorded it as already applied and the SSIDs have not\n"
+            "changed since"),
+      required=False)
+
+    a("--profile",
+      dest="profile",
+      nargs="?",
+      const="-",
+      metavar="[file]",
+      help=("time the CoreWLAN calls, conversions, and subprocesses made by\n"
+            "this run, and write a JSON summary to stderr (or to the file)\n"
+            "at exit; this can also be set with 'SSIDSHUFFLE_PROFILE'"),
       required=False)
 
     a("--networksetup",
       action="store_true",
       dest="use_networksetup",
-      default=major_os_version() >= 13,
+      default=None,
       help=argparse.SUPPRESS,
       required=False)
 
@@ -117,7 +224,16 @@ def _arguments() -> None:
 
     args = parser.parse_args()
 
-    if args.ssids and major_os_version() >= 12 and not geteuid() == 0 and not args.dry_run:
+    if args.profile:
+        from ssidlib.utils.profiling import enable
+        enable(args.profile)
+
+    # Deferred until after '--help'/'--version' have been handled
+    from ssidlib.utils.sysinfo import major_os_version
+
+    reordering = args.ssids or args.order_by or args.policy
+
+    if reordering and major_os_version() >= 12 and not geteuid() == 0 and not args.dry_run:
         print("You must be root to apply these changes.", file=sys.stderr)
         sys.exit(1)
 
@@ -129,8 +245,49 @@ def _arguments() -> None:
         msg = f"{NAME}: error: argument -l, --list-current: not allowed with argument --power-cycle"
         _print_arg_err(msg=msg, parser=parser)
 
-    if args.interface and args.interface not in valid_interfaces:
+    if not reordering:
+        if not (args.list_current or args.power_cycle or args.dump):
+            msg = f"{NAME}: error: the following arguments are required: -s, --ssids (or --order-by, --policy)"
+            _print_arg_err(msg=msg, parser=parser)
+
+    if not args.format == "text" and not (args.list_current or args.dump or args.dry_run):
+        msg = f"{NAME}: error: argument --format: only allowed with -l, --list-current, --dump, or -n, --dry-run"
+        _print_arg_err(msg=msg, parser=parser)
+
+    if not args.format == "text" and (args.power_cycle or args.watch):
+        msg = f"{NAME}: error: argument --format: not allowed with argument --power-cycle or --watch"
+        _print_arg_err(msg=msg, parser=parser)
+
+    if args.watch and not reordering:
+        msg = f"{NAME}: error: the following arguments are required: -s, --ssids (or --order-by) when using --watch"
+        _print_arg_err(msg=msg, parser=parser)
+
+    if args.watch and args.policy:
+        msg = f"{NAME}: error: argument --watch: not allowed with argument --policy"
+        _print_arg_err(msg=msg, parser=parser)
+
+    if args.policy:
+        from ssidlib.policy import load_policy
+
+        try:
+            args.policy = load_policy(args.policy)
+        except (OSError, ValueError) as e:
+            _print_arg_err(msg=f"{NAME}: error: argument --policy: {e}", parser=parser)
+
+    if args.use_networksetup and not reordering:
+        msg = f"{NAME}: error: the following arguments are required: -s, --ssids when using --networksetup"
+        _print_arg_err(msg=msg, parser=parser)
+
+    # 'networksetup' is used by default on macOS 13+, only check the OS version when it matters
+    if args.use_networksetup is None:
+        args.use_networksetup = bool(reordering) and major_os_version() >= 13
+
+    from ssidlib.corewlan import WLan
+    w = WLan(iface=args.interface)
+
+    if args.interface and args.interface not in w.valid_interfaces:
         msg = f"{NAME}: error: {args.interface!r} is not a valid wireless interface"
+        iface = WLan().interface.name
 
         # Offer up interface as a hint
         if iface:
@@ -138,32 +295,142 @@ def _arguments() -> None:
 
         _print_arg_err(msg=msg, parser=parser)
 
-    if not args.ssids:
-        if not (args.list_current or args.power_cycle):
-            msg = f"{NAME}: error: the following arguments are required: -s, --ssids"
-            _print_arg_err(msg=msg, parser=parser)
+    return (args, w)  # Reuse the instantiated WLan object
 
-    if args.use_networksetup and not args.ssids:
-        msg = f"{NAME}: error: the following arguments are required: -s, --ssids when using --networksetup"
-        _print_arg_err(msg=msg, parser=parser)
 
-    return (args, w)  # Reuse the instantiated WLan object
+def print_dump(dumps: list) -> None:
+    """Print the '--dump' output of each interface as text.
+
+    :param dumps: list of dictionaries, as returned by 'WirelessInterface.as_dict()'"""
+    lines = list()
+
+    for dump in dumps:
+        if lines:
+            lines.append("")  # blank line between interfaces
+
+        lines.extend(f"{k}: {v}" for k, v in dump.items() if not k == "profiles")
+        lines.append("profiles:")
+        lines.extend(f" {p['index']}: {p['ssid']!r}, security type: {p['security']} "
+                     f"(networksetup type: {p['networksetup_security']!r})" for p in dump["profiles"])
+
+    print("\n".join(lines))
 
 
 def main():
     """Main"""
+    # Worker processes of the standalone (frozen) build re-run this, 'plan' starts them with a process pool
+    multiprocessing.freeze_support()
+
+    # The 'plan' subcommand works on exported profile lists, it never loads CoreWLAN
+    if sys.argv[1:2] == ["plan"]:
+        from ssidlib.plan import main as plan_main
+        sys.exit(plan_main(sys.argv[2:]))
+
     args, wifi = _arguments()
+    from ssidlib.corewlan import WLanError
+
+    # 'WLan' raises errors (after writing the details to stderr), they are turned into the exit code here
+    try:
+        _main(args, wifi)
+    except WLanError as e:
+        sys.exit(e.code)
+
+
+def _main(args: argparse.Namespace, wifi: Any) -> None:
+    """Run the actions of the parsed arguments.
+
+    :param args: the parsed arguments
+    :param wifi: the WLan object of the interface"""
+    from ssidlib.utils import output
 
     if args.list_current:
-        print("Current SSID order:")
-        wifi.current_ssid_order()
+        if args.format == "text":
+            print("Current SSID order:")
+            wifi.current_ssid_order()
+        else:
+            name, profiles = wifi.interface.name, wifi.interface.profiles_as_dicts()
+            output.write({"interface": name, "profiles": profiles},
+                         args.format,
+                         rows=[{"interface": name, **profile} for profile in profiles])
+
+    if args.dump:
+        interfaces = [wifi.interface] if args.interface else wifi.interfaces
+        dumps = [interface.as_dict() for interface in interfaces]
+
+        if args.format == "text":
+            print_dump(dumps)
+        else:
+            output.write({"interfaces": dumps}, args.format, rows=dumps)
+
+    if args.policy:
+        from ssidlib.policy import apply_policy, print_results
+        from ssidlib.utils.state import AppliedState
+
+        results = apply_policy(rules=args.policy,
+                               interfaces=[args.interface] if args.interface else None,
+                               use_networksetup=args.use_networksetup,
+                               dry_run=args.dry_run,
+                               state=None if args.dry_run else AppliedState(),
+                               force=args.force)
+        if args.format == "text":
+            print_results(results)
+        else:
+            rows = [asdict(result) for result in results]
+            output.write({"results": rows}, args.format, rows=rows)
+
+        if any(result.status in ["missing", "failed"] for result in results):
+            sys.exit(1)
+
+    if args.watch:
+        from ssidlib.watch import CoreWLANEventSource, Watcher
+
+        def policy(wlan):
+            if args.order_by:
+                return wlan.order_by_signal(band_bonus={args.prefer_band: args.band_bonus})
+
+            return args.ssids
+
+        print(f"Watching wireless interface {wifi.interface.name!r} for changes")
+        Watcher(wlan=wifi,
+                policy=policy,
+                source=CoreWLANEventSource(client=wifi.client),
+                debounce=args.debounce,
+                interval=args.watch_interval,
+                use_networksetup=args.use_networksetup,
+                dry_run=args.dry_run).run()
+        sys.exit()
+
+    if args.order_by:
+        args.ssids = wifi.order_by_signal(band_bonus={args.prefer_band: args.band_bonus})
 
     if args.ssids:
+        state, policy = None, None
+
+        # A fixed SSID order can be checked against the state recorded by the last run that applied it
+        if not (args.order_by or args.dry_run):
+            from ssidlib.utils.state import AppliedState, fingerprint
+            state, policy = AppliedState(), fingerprint(["ssids", args.ssids])
+
+            if not args.force and state.is_applied(wifi.interface.name, policy, wifi.interface.profiles_fingerprint):
+                print("No changes to apply to SSID order.")
+                sys.exit()
+
         new_order = wifi.reorder(new_order=args.ssids)
+        changed = not new_order == wifi.interface.network_profiles
+
+        if args.dry_run and not args.format == "text":
+            output.write({"interface": wifi.interface.name,
+                          "changed": changed,
+                          "current": wifi.interface.profiles_as_dicts(),
+                          "new": wifi.interface.profiles_as_dicts(new_order)},
+                         args.format)
+            sys.exit()
 
         # Check there are changes to make.
-        if [o2p(profile.ssid()) for profile in new_order] == [o2p(profile.ssid()) for profile in
-                                                              wifi.interface.network_profiles]:
+        if not changed:
+            if state:
+                state.record(wifi.interface.name, policy, wifi.interface.profiles_fingerprint)
+
             print("No changes to apply to SSID order.")
             sys.exit()
 
@@ -172,17 +439,26 @@ def main():
             wifi.current_ssid_order()
 
             print("New SSID order:")
-
-            for profile in new_order:
-                index = new_order.index(profile)
-                print(f" {index}: {profile.ssid()!r}")
+            wifi.print_ssid_order(new_order)
         else:
             wifi.commit(new_order=new_order, use_networksetup=args.use_networksetup)
 
+            # Only record the policy if the change is actually visible in the network profiles
+            if state and wifi.reorder(new_order=args.ssids) == wifi.interface.network_profiles:
+                state.record(wifi.interface.name, policy, wifi.interface.profiles_fingerprint)
+
     if args.power_cycle:
         if not args.dry_run:
             print(f"Power cycling wireless interface {wifi.interface.name!r}")
-            wifi.power_cycle()
+            result = wifi.power_cycle(timeout=args.power_cycle_timeout)
+            phases = ", ".join(f"{phase} {elapsed:.2f}s" for phase, elapsed in result.phases.items())
+
+            if not result.ready:
+                print(f"Error: Timed out waiting for {result.timed_out!r} after {result.total:.2f}s ({phases})",
+                      file=sys.stderr)
+                sys.exit(1)
+
+            print(f"Power cycled wireless interface in {result.total:.2f}s ({phases})")
         else:
             print(f"Would power cycle wireless interface {wifi.interface.name!r}")
 
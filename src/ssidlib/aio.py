@@ -0,0 +1,157 @@
+"""An asyncio facade over 'WLan', for callers running an event loop (for example a management agent).
+
+CoreWLAN calls are blocking, and an active scan or a commit takes seconds, so every call is run on one
+dedicated worker thread that owns the 'WLan' object; calls are serialized in the order they are made, and
+the event loop is never blocked. Errors are raised as 'WLanError', as they are by 'WLan'."""
+from __future__ import annotations
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Tuple
+
+from .corewlan import WLan, WLanError  # NOQA - 'WLanError' is raised from here too
+from .models.networks import WirelessNetwork
+from .utils.readiness import PowerCycleResult, backoff
+
+if TYPE_CHECKING:
+    from CoreWLAN import CWNetworkProfile  # NOQA
+
+
+class AsyncWLan:
+    """Async wrapper around one 'WLan' object. The 'WLan' object is created on the worker thread on first use,
+    with the same arguments as 'WLan'. Use 'close()' (or 'async with') to stop the worker thread."""
+    def __init__(self,
+                 iface: Optional[str] = None,
+                 ttl: int | float = 30,
+                 backend: Optional[Any] = None,
+                 scan_ttl: int | float = 30) -> None:
+        """Initialise.
+
+        :param iface: the wireless interface name, for example: 'en1'; defaults to the current interface
+        :param ttl: number of seconds an interface snapshot is considered current
+        :param backend: the backend providing the CoreWLAN objects, defaults to the current backend
+        :param scan_ttl: number of seconds scan results are considered current"""
+        self.iface = iface
+        self._kwargs = {"iface": iface, "ttl": ttl, "backend": backend, "scan_ttl": scan_ttl}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ssidshuffle-wlan")
+        self._wlan = None
+
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    async def __aenter__(self) -> AsyncWLan:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    # ------------------- Functions -----------------------------------------------------------------------------------
+    async def associate(self, ssid: str, password: Optional[str] = None) -> Optional[Tuple[bool, Any, Any]]:
+        """Associate to an SSID, see 'WLan.associate()'.
+
+        :param ssid: SSID to associate to
+        :param password: optional password (string) to use when associating"""
+        return await self._run(lambda wlan: wlan.associate(ssid, password=password))
+
+    async def close(self) -> None:
+        """Wait for queued calls to finish, then stop the worker thread."""
+        await asyncio.get_running_loop().run_in_executor(None, self._executor.shutdown)
+
+    async def commit(self,
+                     new_order: List[CWNetworkProfile],
+                     use_networksetup: bool = False,
+                     verify: bool = True) -> None:
+        """Commit changes to the ordering of the preferred networks, see 'WLan.commit()'; a failed commit (which
+        is rolled back) raises 'WLanError'.
+
+        :param new_order: the new order of network profiles to apply, for example the result of 'reorder()'
+        :param use_networksetup: apply the new order with 'networksetup' instead of CoreWLAN
+        :param verify: verify the result against the new order"""
+        await self._run(lambda wlan: wlan.commit(new_order, use_networksetup=use_networksetup, verify=verify))
+
+    async def power_cycle(self,
+                          wait: int | float = 0,
+                          timeout: int | float = 30,
+                          interval: int | float = 0.05,
+                          max_interval: int | float = 1) -> PowerCycleResult:
+        """Power cycle the wireless interface, waiting for the interface to report each state rather than for a
+        fixed time, see 'WLan.power_cycle()'; returns the time each phase took. Other calls are queued behind
+        the power cycle.
+
+        :param wait: minimum number of seconds to keep the power off, after the interface reports it as off
+        :param timeout: number of seconds all phases must complete in
+        :param interval: number of seconds before the second check of each phase, doubled after each check
+        :param max_interval: maximum number of seconds between checks"""
+        return await self._run(lambda wlan: wlan.power_cycle(wait=wait, timeout=timeout, interval=interval,
+                                                             max_interval=max_interval))
+
+    async def reorder(self, new_order: List[str]) -> List[CWNetworkProfile]:
+        """Reorder the current list of network profiles, see 'WLan.reorder()'; SSIDs that are not configured
+        raise 'WLanError'.
+
+        :param new_order: a list of SSID names (as strings) in the order they will be organised into"""
+        return await self._run(lambda wlan: wlan.reorder(new_order))
+
+    async def run(self, func: Callable[[WLan], Any]) -> Any:
+        """Run a function with the 'WLan' object on the worker thread, returning its result. Use this for
+        anything not wrapped here, and to read 'WirelessInterface' attributes, as they are resolved from
+        CoreWLAN on first access, for example: 'await wlan.run(lambda wlan: wlan.interface.as_dict())'
+
+        :param func: callable taking the 'WLan' object"""
+        return await self._run(func)
+
+    async def scan(self,
+                   ssid: Optional[str] = None,
+                   include_hidden: bool = False,
+                   max_age: Optional[int | float] = None) -> List[WirelessNetwork]:
+        """Scan for wireless networks, see 'WLan.scan_for_networks()'.
+
+        :param ssid: optional SSID name (string) to scan for, all networks are returned if not provided
+        :param include_hidden: include hidden networks (networks that do not broadcast an SSID)
+        :param max_age: number of seconds cached scan results are considered current"""
+        return await self._run(lambda wlan: wlan.scan_for_networks(ssid=ssid, include_hidden=include_hidden,
+                                                                   max_age=max_age))
+
+    async def wait_for_power(self,
+                             power: bool,
+                             timeout: int | float = 30,
+                             interval: int | float = 0.05,
+                             max_interval: int | float = 1) -> bool:
+        """Wait for the interface to report a power state, checking with an exponential backoff; returns True if
+        it did within 'timeout' seconds. The event loop is free while waiting.
+
+        :param power: the power state to wait for
+        :param timeout: number of seconds to wait
+        :param interval: number of seconds before the second check, doubled after each check
+        :param max_interval: maximum number of seconds between checks"""
+        deadline = monotonic() + timeout
+
+        if await self._run(lambda wlan: wlan.is_powered()) == power:
+            return True
+
+        for delay in backoff(deadline, interval=interval, max_interval=max_interval):
+            await asyncio.sleep(delay)
+
+            if await self._run(lambda wlan: wlan.is_powered()) == power:
+                return True
+
+        return False
+
+    # ------------------- "Private" Functions -------------------------------------------------------------------------
+    async def _run(self, func: Callable[[WLan], Any]) -> Any:
+        """Queue a function on the worker thread and wait for its result.
+
+        :param func: callable taking the 'WLan' object"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._call, func)
+
+    def _call(self, func: Callable[[WLan], Any]) -> Any:
+        """Call a function with the 'WLan' object, creating it first if needed; this runs on the worker thread.
+
+        :param func: callable taking the 'WLan' object"""
+        if self._wlan is None:
+            self._wlan = WLan(**self._kwargs)
+
+        return func(self._wlan)
@@ -0,0 +1,56 @@
+"""Backends provide the CoreWLAN objects that 'WLan' and the models talk to.
+
+The 'corewlan' backend is the real CoreWLAN framework (via PyObjC), the 'fake' backend is a deterministic
+in-memory stand-in that can be used off macOS, for example for profiling and benchmarking. The backend is
+chosen with the 'SSIDSHUFFLE_BACKEND' environment variable, or with 'set_backend()' before any of the
+models are imported, as 'models/constants.py' builds the lookup tables from the backend constants at import
+time.
+When profiling is enabled (see 'utils/profiling.py'), the current backend is wrapped so its calls are timed."""
+import os
+
+from typing import Any, Optional
+
+from .profiled import ProfiledBackend
+from ..utils import profiling
+
+BACKEND_ENV = "SSIDSHUFFLE_BACKEND"
+BACKENDS = ["corewlan", "fake"]
+
+_backend = None
+
+
+def get_backend() -> Any:
+    """Return the current backend, creating the default backend on first use."""
+    global _backend
+
+    if _backend is None:
+        set_backend(os.environ.get(BACKEND_ENV, "corewlan"))
+
+    # Profiling can be enabled after the backend was created, for example by the models importing it
+    if profiling.profiler() and not isinstance(_backend, ProfiledBackend):
+        _backend = ProfiledBackend(_backend)
+
+    return _backend
+
+
+def set_backend(backend: Optional[str | Any] = None, **kwargs) -> Any:
+    """Set the current backend.
+
+    :param backend: name of the backend ('corewlan' or 'fake'), or a backend object
+    :param **kwargs: arguments to pass on to the backend class when a backend name is used"""
+    global _backend
+
+    if backend is None or isinstance(backend, str):
+        name = backend or "corewlan"
+
+        if name == "corewlan":
+            from .corewlan import CoreWLANBackend
+            backend = CoreWLANBackend(**kwargs)
+        elif name == "fake":
+            from .fake import FakeBackend
+            backend = FakeBackend(**kwargs)
+        else:
+            raise ValueError(f"Unknown backend {name!r}, valid backends are: {', '.join(BACKENDS)}")
+
+    _backend = backend
+    return _backend
@@ -0,0 +1,105 @@
+from functools import lru_cache
+from time import monotonic, sleep
+from typing import Any, Callable, List
+
+
+@lru_cache(maxsize=None)
+def _event_delegate_class() -> Any:
+    """Return the 'CWEventDelegate' class; the PyObjC class can only be defined once, so it is created on first
+    use and cached."""
+    import CoreWLAN  # NOQA - loads the framework, so the 'CWEventDelegate' protocol is registered
+    import objc
+    from Foundation import NSObject
+
+    # Declaring the protocol gives PyObjC the method signatures, so the 'rssi' (NSInteger) and 'rate' (double)
+    # arguments of the link quality event are passed as numbers rather than objects
+    class SSIDShuffleEventDelegate(NSObject, protocols=[objc.protocolNamed("CWEventDelegate")]):
+        def initWithCallback_(self, callback):
+            self = objc.super(SSIDShuffleEventDelegate, self).init()
+
+            if self is not None:
+                self.callback = callback
+
+            return self
+
+        def bssidDidChangeForWiFiInterfaceWithName_(self, name):
+            self.callback("bssid", str(name))
+
+        def countryCodeDidChangeForWiFiInterfaceWithName_(self, name):
+            self.callback("country_code", str(name))
+
+        def linkDidChangeForWiFiInterfaceWithName_(self, name):
+            self.callback("link", str(name))
+
+        def linkQualityDidChangeForWiFiInterfaceWithName_rssi_transmitRate_(self, name, rssi, rate):
+            self.callback("link_quality", str(name))
+
+        def modeDidChangeForWiFiInterfaceWithName_(self, name):
+            self.callback("mode", str(name))
+
+        def powerStateDidChangeForWiFiInterfaceWithName_(self, name):
+            self.callback("power", str(name))
+
+        def scanCacheUpdatedForWiFiInterfaceWithName_(self, name):
+            self.callback("scan_cache", str(name))
+
+        def ssidDidChangeForWiFiInterfaceWithName_(self, name):
+            self.callback("ssid", str(name))
+
+    return SSIDShuffleEventDelegate
+
+
+class CoreWLANBackend:
+    """Backend for the real CoreWLAN framework. The PyObjC framework bridges are imported on first use."""
+    name = "corewlan"
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    @property
+    def constants(self) -> Any:
+        """Return the module that holds the 'kCW*' constants."""
+        import CoreWLAN
+        return CoreWLAN
+
+    def client(self) -> Any:
+        """Return the shared 'CWWiFiClient' object."""
+        from CoreWLAN import CWWiFiClient
+        return CWWiFiClient.sharedWiFiClient()
+
+    def configuration(self, configuration: Any, mutable: bool = False) -> Any:
+        """Return a copy of an interface configuration as either an immutable or mutable configuration object.
+
+        :param configuration: the 'CWConfiguration' object to copy
+        :param mutable: boolean flag to return an immutable (False) or mutable (True) configuration object"""
+        from CoreWLAN import CWConfiguration, CWMutableConfiguration
+        conf = CWConfiguration if not mutable else CWMutableConfiguration
+        return conf.alloc().initWithConfiguration_(configuration)
+
+    def event_delegate(self, callback: Callable[[str, str], None]) -> Any:
+        """Return a 'CWEventDelegate' object for use with 'CWWiFiClient.setDelegate_'.
+
+        :param callback: called with the event name and the interface name for each event"""
+        return _event_delegate_class().alloc().initWithCallback_(callback)
+
+    def run_loop(self, seconds: int | float) -> None:
+        """Run the run loop of the current thread for a number of seconds, so CoreWLAN can deliver event
+        delegate callbacks to this thread.
+
+        :param seconds: number of seconds to run the run loop for"""
+        from Foundation import NSDate, NSRunLoop
+        end = monotonic() + seconds
+        NSRunLoop.currentRunLoop().runUntilDate_(NSDate.dateWithTimeIntervalSinceNow_(seconds))
+
+        # The run loop returns straight away when it has no input sources, do not turn that into a busy loop
+        remaining = end - monotonic()
+
+        if remaining > 0:
+            sleep(remaining)
+
+    def ordered_set(self, profiles: List[Any]) -> Any:
+        """Return an 'NSOrderedSet' of network profiles for use with 'setNetworkProfiles_'.
+
+        :param profiles: list of network profiles"""
+        from Foundation import NSOrderedSet
+        return NSOrderedSet.orderedSetWithArray_(profiles)
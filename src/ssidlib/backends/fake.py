@@ -0,0 +1,469 @@
+"""Deterministic in-memory stand-in for CoreWLAN.
+
+The fake objects mirror the PyObjC method names of the CoreWLAN objects used by 'ssidlib', and return
+native Python values. Profiles and scan results are generated from a seed, so the same arguments always
+produce the same interfaces, network profiles and networks."""
+import random
+
+from time import sleep
+from types import SimpleNamespace
+from typing import Any, List, Optional, Tuple
+
+# Values match the CoreWLAN enums and (deprecated) constants.
+CONSTANTS = SimpleNamespace(kCWChannelBand2GHz=1,
+                            kCWChannelBand5GHz=2,
+                            kCWChannelBandUnknown=0,
+                            kCWChannelWidth160MHz=4,
+                            kCWChannelWidth20MHz=1,
+                            kCWChannelWidth40MHz=2,
+                            kCWChannelWidth80MHz=3,
+                            kCWChannelWidthUnknown=0,
+                            kCWInterfaceModeHostAP=3,
+                            kCWInterfaceModeIBSS=2,
+                            kCWInterfaceModeNone=0,
+                            kCWInterfaceModeStation=1,
+                            kCWInterfaceStateAssociating=3,
+                            kCWInterfaceStateAuthenticating=2,
+                            kCWInterfaceStateInactive=0,
+                            kCWInterfaceStateRunning=4,
+                            kCWInterfaceStateScanning=1,
+                            kCWOpModeHostAP=3,
+                            kCWOpModeIBSS=1,
+                            kCWOpModeMonitorMode=2,
+                            kCWOpModeStation=0,
+                            kCWOpNotPermitted=-3930,
+                            kCWPHYMode11a=1,
+                            kCWPHYMode11ac=5,
+                            kCWPHYMode11ax=6,
+                            kCWPHYMode11b=2,
+                            kCWPHYMode11g=3,
+                            kCWPHYMode11n=4,
+                            kCWPHYModeNone=0,
+                            kCWSecurityDynamicWEP=6,
+                            kCWSecurityEnterprise=10,
+                            kCWSecurityModeDynamicWEP=7,
+                            kCWSecurityModeOpen=0,
+                            kCWSecurityModeWEP=1,
+                            kCWSecurityModeWPA2_Enterprise=5,
+                            kCWSecurityModeWPA2_PSK=3,
+                            kCWSecurityModeWPA_Enterprise=4,
+                            kCWSecurityModeWPA_PSK=2,
+                            kCWSecurityModeWPS=6,
+                            kCWSecurityNone=0,
+                            kCWSecurityPersonal=5,
+                            kCWSecurityUnknown=9223372036854775807,
+                            kCWSecurityWEP=1,
+                            kCWSecurityWPA2Enterprise=9,
+                            kCWSecurityWPA2Personal=4,
+                            kCWSecurityWPA3Enterprise=12,
+                            kCWSecurityWPA3Personal=11,
+                            kCWSecurityWPA3Transition=13,
+                            kCWSecurityWPAEnterprise=7,
+                            kCWSecurityWPAEnterpriseMixed=8,
+                            kCWSecurityWPAPersonal=2,
+                            kCWSecurityWPAPersonalMixed=3)
+
+# Security types that 'networksetup' can re-add, so generated profiles can be committed either way.
+PROFILE_SECURITY = [0, 1, 2, 3, 4, 7, 9, 11, 12, 13]
+# CWEventType values and the event delegate methods they are delivered to
+EVENT_SCAN_CACHE = 8
+EVENT_METHODS = {1: "powerStateDidChangeForWiFiInterfaceWithName_",
+                 2: "ssidDidChangeForWiFiInterfaceWithName_",
+                 3: "bssidDidChangeForWiFiInterfaceWithName_",
+                 4: "linkDidChangeForWiFiInterfaceWithName_",
+                 EVENT_SCAN_CACHE: "scanCacheUpdatedForWiFiInterfaceWithName_"}
+CHANNELS = [(1, 1), (6, 1), (11, 1), (36, 2), (40, 2), (44, 2), (48, 2), (149, 2), (153, 2), (157, 2)]
+
+
+class FakeError:
+    def __init__(self, code: int, domain: str = "com.apple.coreWLAN.error") -> None:
+        self._code = code
+        self._domain = domain
+
+    def code(self) -> int:
+        return self._code
+
+    def domain(self) -> str:
+        return self._domain
+
+
+class FakeChannel:
+    def __init__(self, number: int, band: int, width: int) -> None:
+        self._number = number
+        self._band = band
+        self._width = width
+
+    def channelBand(self) -> int:
+        return self._band
+
+    def channelNumber(self) -> int:
+        return self._number
+
+    def channelProperties(self) -> int:
+        return 0
+
+    def channelWidth(self) -> int:
+        return self._width
+
+
+class FakeNetworkProfile:
+    def __init__(self, ssid: str, security: int) -> None:
+        self._ssid = ssid
+        self._security = security
+
+    def __repr__(self):
+        return f"{type(self).__name__}(ssid={self._ssid!r}, security={self._security!r})"
+
+    def security(self) -> int:
+        return self._security
+
+    def ssid(self) -> str:
+        return self._ssid
+
+
+class FakeNetwork:
+    def __init__(self, ssid: Optional[str], bssid: str, rssi: int, noise: int, channel: FakeChannel,
+                 security: int) -> None:
+        self._ssid = ssid
+        self._bssid = bssid
+        self._rssi = rssi
+        self._noise = noise
+        self._channel = channel
+        self._security = security
+
+    def __repr__(self):
+        return f"{type(self).__name__}(ssid={self._ssid!r}, bssid={self._bssid!r}, rssi={self._rssi!r})"
+
+    def bssid(self) -> str:
+        return self._bssid
+
+    def countryCode(self) -> str:
+        return "US"
+
+    def noiseMeasurement(self) -> int:
+        return self._noise
+
+    def rssi(self) -> int:
+        return self._rssi
+
+    def rssiValue(self) -> int:
+        return self._rssi
+
+    def securityMode(self) -> int:
+        return self._security
+
+    def ssid(self) -> Optional[str]:
+        return self._ssid
+
+    def wlanChannel(self) -> FakeChannel:
+        return self._channel
+
+
+class FakeOrderedSet:
+    def __init__(self, items: List[Any]) -> None:
+        self._items = list(dict.fromkeys(items))
+
+    def array(self) -> List[Any]:
+        return list(self._items)
+
+    def count(self) -> int:
+        return len(self._items)
+
+
+class FakeConfiguration:
+    def __init__(self, profiles: List[FakeNetworkProfile], mutable: bool = False) -> None:
+        self._profiles = FakeOrderedSet(profiles)
+        self._mutable = mutable
+
+    def networkProfiles(self) -> FakeOrderedSet:
+        return self._profiles
+
+    def setNetworkProfiles_(self, profiles: FakeOrderedSet) -> None:
+        if not self._mutable:
+            raise AttributeError("'FakeConfiguration' object is immutable")
+
+        self._profiles = FakeOrderedSet(profiles.array())
+
+
+class FakeIPMonitor:
+    def __init__(self, index: int) -> None:
+        self._index = index
+
+    def ipv4Addresses(self) -> List[str]:
+        return [f"10.0.{self._index}.10"]
+
+    def ipv4Router(self) -> str:
+        return f"10.0.{self._index}.1"
+
+    def ipv6Addresses(self) -> List[str]:
+        return [f"fe80::{self._index}:10"]
+
+    def ipv6Router(self) -> str:
+        return f"fe80::{self._index}:1"
+
+
+class FakeInterface:
+    def __init__(self, name: str, index: int, profiles: List[FakeNetworkProfile],
+                 networks: List[FakeNetwork]) -> None:
+        self._name = name
+        self._index = index
+        self._configuration = FakeConfiguration(profiles)
+        self._networks = networks
+        self._power = True
+        self._associated = networks[0] if networks else None
+        self._client = None  # set by the client, scans are reported to its event delegate
+        self.commit_error = None  # set to an error code to make commits fail
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self._name!r})"
+
+    def activePHYMode(self) -> int:
+        return CONSTANTS.kCWPHYMode11ac
+
+    def associateToNetwork_password_error_(self, network: FakeNetwork, password: Optional[str],
+                                           error: Any) -> Tuple[bool, Optional[FakeError]]:
+        self._associated = network
+        return (True, None)
+
+    def bssid(self) -> Optional[str]:
+        return self._associated.bssid() if self._power and self._associated else None
+
+    def cachedScanResults(self) -> set:
+        return set(self._networks)
+
+    def commitConfiguration_authorization_error_(self, configuration: FakeConfiguration, authorization: Any,
+                                                 error: Any) -> Tuple[bool, Optional[FakeError]]:
+        if self.commit_error is not None:
+            return (False, FakeError(self.commit_error))
+
+        self._configuration = FakeConfiguration(configuration.networkProfiles().array())
+        return (True, None)
+
+    def configuration(self) -> FakeConfiguration:
+        return self._configuration
+
+    def countryCode(self) -> str:
+        return "US"
+
+    def hardwareAddress(self) -> str:
+        return f"02:00:00:00:00:{self._index:02x}"
+
+    def interfaceMode(self) -> int:
+        return CONSTANTS.kCWInterfaceModeStation
+
+    def interfaceName(self) -> str:
+        return self._name
+
+    def interfaceState(self) -> int:
+        return CONSTANTS.kCWInterfaceStateRunning if self._power else CONSTANTS.kCWInterfaceStateInactive
+
+    def ipMonitor(self) -> FakeIPMonitor:
+        return FakeIPMonitor(self._index)
+
+    def lastNetworkJoined(self) -> Optional[FakeNetwork]:
+        return self._associated
+
+    def lastPreferredNetworkJoined(self) -> Optional[FakeNetwork]:
+        return self._associated
+
+    def lastTetherDeviceJoined(self) -> None:
+        return None
+
+    def networkInterfaceAvailable(self) -> bool:
+        return True
+
+    def noiseMeasurement(self) -> int:
+        return self._associated.noiseMeasurement() if self._power and self._associated else 0
+
+    def opMode(self) -> int:
+        return CONSTANTS.kCWOpModeStation
+
+    def phyMode(self) -> int:
+        return CONSTANTS.kCWPHYMode11ac
+
+    def power(self) -> bool:
+        return self._power
+
+    def powerOn(self) -> bool:
+        return self._power
+
+    def rssiValue(self) -> int:
+        return self._associated.rssiValue() if self._power and self._associated else 0
+
+    def scanForNetworksWithName_error_(self, ssid: Optional[str], error: Any) -> Tuple[set, None]:
+        return self.scanForNetworksWithName_includeHidden_error_(ssid, False, error)
+
+    def scanForNetworksWithName_includeHidden_error_(self, ssid: Optional[str], include_hidden: bool,
+                                                     error: Any) -> Tuple[set, None]:
+        if self._client:
+            self._client.event(EVENT_SCAN_CACHE, self._name)
+
+        return ({n for n in self._networks
+                 if (ssid is None or n.ssid() == ssid) and (include_hidden or n.ssid() is not None)}, None)
+
+    def securityMode(self) -> int:
+        return CONSTANTS.kCWSecurityModeWPA2_PSK
+
+    def serviceActive(self) -> bool:
+        return self._power
+
+    def setPower_error_(self, power: bool, error: Any) -> Tuple[bool, None]:
+        self._power = bool(power)
+        return (True, None)
+
+    def ssid(self) -> Optional[str]:
+        return self._associated.ssid() if self._power and self._associated else None
+
+    def transmitPower(self) -> int:
+        return 20
+
+    def transmitRate(self) -> float:
+        return 866.0
+
+    def txRate(self) -> float:
+        return 866.0
+
+    def wlanChannel(self) -> Optional[FakeChannel]:
+        return self._associated.wlanChannel() if self._associated else FakeChannel(0, 0, 0)
+
+
+class FakeEventDelegate:
+    def __init__(self, callback: Any) -> None:
+        self.callback = callback
+
+    def bssidDidChangeForWiFiInterfaceWithName_(self, name: str) -> None:
+        self.callback("bssid", name)
+
+    def linkDidChangeForWiFiInterfaceWithName_(self, name: str) -> None:
+        self.callback("link", name)
+
+    def powerStateDidChangeForWiFiInterfaceWithName_(self, name: str) -> None:
+        self.callback("power", name)
+
+    def scanCacheUpdatedForWiFiInterfaceWithName_(self, name: str) -> None:
+        self.callback("scan_cache", name)
+
+    def ssidDidChangeForWiFiInterfaceWithName_(self, name: str) -> None:
+        self.callback("ssid", name)
+
+
+class FakeWiFiClient:
+    def __init__(self, interfaces: List[FakeInterface]) -> None:
+        self._interfaces = interfaces
+        self._delegate = None
+        self._monitoring = set()
+
+        for iface in interfaces:
+            iface._client = self
+
+    def event(self, event_type: int, name: str) -> None:
+        """Send an event to the delegate, if events of this type are monitored, like CoreWLAN does; for example
+        every scan sends a scan cache event."""
+        if self._delegate and event_type in self._monitoring:
+            getattr(self._delegate, EVENT_METHODS[event_type])(name)
+
+    def interface(self) -> Optional[FakeInterface]:
+        return self._interfaces[0] if self._interfaces else None
+
+    def interfaceWithName_(self, name: str) -> Optional[FakeInterface]:
+        return next((iface for iface in self._interfaces if iface.interfaceName() == name), None)
+
+    def interfaces(self) -> List[FakeInterface]:
+        return list(self._interfaces)
+
+    def setDelegate_(self, delegate: Any) -> None:
+        self._delegate = delegate
+
+    def startMonitoringEventWithType_error_(self, event_type: int, error: Any) -> Tuple[bool, None]:
+        self._monitoring.add(event_type)
+        return (True, None)
+
+    def stopMonitoringAllEventsAndReturnError_(self, error: Any) -> Tuple[bool, None]:
+        self._monitoring.clear()
+        return (True, None)
+
+
+class FakeBackend:
+    """In-memory backend generating 'profiles' saved network profiles and 'networks' scan results for each
+    of 'interfaces' wireless interfaces ('en0', 'en1', ...).
+
+    Profiles are named 'Network-00000' onwards; every 'duplicate_every'th profile re-uses the name of the
+    profile before it with a different security type, as CoreWLAN allows the same SSID to be saved more
+    than once. Scan results include the first 'networks' profiles, so reordering by signal finds them."""
+    name = "fake"
+
+    def __init__(self,
+                 profiles: int = 10,
+                 networks: int = 20,
+                 interfaces: int = 1,
+                 seed: int = 0,
+                 duplicate_every: int = 0) -> None:
+        self.constants = CONSTANTS
+        self.profiles = int(profiles)
+        self.networks = int(networks)
+        self.seed = seed
+        self.duplicate_every = int(duplicate_every)
+        self._client = FakeWiFiClient([self._interface(index) for index in range(int(interfaces))])
+
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k == "constants")]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    def client(self) -> FakeWiFiClient:
+        """Return the fake 'CWWiFiClient' object; it is shared, like 'CWWiFiClient.sharedWiFiClient()'."""
+        return self._client
+
+    def configuration(self, configuration: FakeConfiguration, mutable: bool = False) -> FakeConfiguration:
+        """Return a copy of an interface configuration as either an immutable or mutable configuration object.
+
+        :param configuration: the configuration object to copy
+        :param mutable: boolean flag to return an immutable (False) or mutable (True) configuration object"""
+        return FakeConfiguration(configuration.networkProfiles().array(), mutable=mutable)
+
+    def event_delegate(self, callback: Any) -> FakeEventDelegate:
+        """Return an event delegate object for use with 'setDelegate_'.
+
+        :param callback: called with the event name and the interface name for each event"""
+        return FakeEventDelegate(callback)
+
+    def ordered_set(self, profiles: List[FakeNetworkProfile]) -> FakeOrderedSet:
+        """Return an ordered set of network profiles for use with 'setNetworkProfiles_'.
+
+        :param profiles: list of network profiles"""
+        return FakeOrderedSet(profiles)
+
+    def run_loop(self, seconds: int | float) -> None:
+        """Wait for a number of seconds; fake events are delivered by calling the delegate directly, from any
+        thread.
+
+        :param seconds: number of seconds to wait"""
+        sleep(seconds)
+
+    def _interface(self, index: int) -> FakeInterface:
+        """Generate one interface with its profiles and scan results."""
+        rng = random.Random(f"{self.seed}:{index}")
+        profiles = list()
+
+        for n in range(self.profiles):
+            if self.duplicate_every and n and n % self.duplicate_every == 0:
+                ssid = profiles[-1].ssid()
+            else:
+                ssid = f"Network-{n:05d}"
+
+            profiles.append(FakeNetworkProfile(ssid=ssid, security=rng.choice(PROFILE_SECURITY)))
+
+        networks = list()
+
+        for n in range(self.networks):
+            ssid = profiles[n].ssid() if n < len(profiles) else (f"Nearby-{n:05d}" if n % 10 else None)
+            number, band = rng.choice(CHANNELS)
+            width = rng.choice([1, 2]) if band == 1 else rng.choice([1, 2, 3, 4])
+            bssid = [0x02, index, n >> 16, n >> 8 & 255, n & 255, rng.randrange(256)]
+            networks.append(FakeNetwork(ssid=ssid,
+                                        bssid=":".join(f"{b:02x}" for b in bssid),
+                                        rssi=rng.randint(-90, -30),
+                                        noise=rng.randint(-98, -88),
+                                        channel=FakeChannel(number=number, band=band, width=width),
+                                        security=rng.choice([0, 2, 3, 5])))
+
+        return FakeInterface(name=f"en{index}", index=index, profiles=profiles, networks=networks)
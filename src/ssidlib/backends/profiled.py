@@ -0,0 +1,52 @@
+from typing import Any, Callable, List
+
+from ..utils.profiling import ProfiledObject, profiled
+
+
+class ProfiledBackend:
+    """Wraps another backend so the calls made on the 'CWWiFiClient' and 'CWInterface' objects, and on the
+    backend itself, are recorded by the profiler; see 'utils/profiling.py'."""
+    def __init__(self, backend: Any) -> None:
+        self._backend = backend
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._backend!r})"
+
+    @property
+    def constants(self) -> Any:
+        return self._backend.constants
+
+    @property
+    def name(self) -> str:
+        return self._backend.name
+
+    @property
+    def backend(self) -> Any:
+        """Return the wrapped backend."""
+        return self._backend
+
+    def client(self) -> ProfiledObject:
+        return ProfiledObject(self._client(),
+                              "CWWiFiClient",
+                              children={"interface": "CWInterface",
+                                        "interfaceWithName_": "CWInterface",
+                                        "interfaces": "CWInterface"},
+                              sequences={"interfaces"})
+
+    @profiled("backend.client")
+    def _client(self) -> Any:
+        return self._backend.client()
+
+    @profiled("backend.configuration")
+    def configuration(self, configuration: Any, mutable: bool = False) -> Any:
+        return self._backend.configuration(configuration, mutable=mutable)
+
+    def event_delegate(self, callback: Callable[[str, str], None]) -> Any:
+        return self._backend.event_delegate(callback)
+
+    def run_loop(self, seconds: int | float) -> None:
+        return self._backend.run_loop(seconds)
+
+    @profiled("backend.ordered_set")
+    def ordered_set(self, profiles: List[Any]) -> Any:
+        return self._backend.ordered_set(profiles)
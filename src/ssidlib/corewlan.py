@@ -1,47 +1,91 @@
+from __future__ import annotations
+
 import sys
 
 from os import geteuid
-from time import sleep
-from typing import Any, Dict, List, Optional, TextIO  # NOQA
-
-from CoreWLAN import (CWConfiguration,
-                      CWWiFiClient,
-                      CWMutableConfiguration,
-                      CWNetworkProfile)
-from Foundation import NSOrderedSet
+from time import monotonic, sleep
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, TextIO, Tuple  # NOQA
 
+from .backends import get_backend
+from .models.constants import INTERFACE_STATES
 from .models.interface import WirelessInterface
+from .models.networks import WirelessNetwork
 from .utils import networksetup
+from .utils.ordering import minimal_moves, rank_by_signal, saved_insert_indexes
 from .utils.pyobjc import o2p
+from .utils.readiness import PowerCycleResult, wait_until
+
+if TYPE_CHECKING:
+    from CoreWLAN import CWNetworkProfile  # NOQA
+
+
+class WLanError(Exception):
+    """A 'WLan' operation failed; the details of the error are written to stderr before this is raised, and
+    'code' is the exit code the command line exits with."""
+    def __init__(self, operation: str, code: int = 1) -> None:
+        self.operation = operation
+        self.code = code
+        super().__init__(f"{operation} failed (exit code {code!r})")
 
 
 class WLan:
     """Parent class containing CoreWLAN wrappers and other various methods relating to CoreWLAN.
-    Note, this parent class only operates on the current available interface."""
-    def __init__(self, iface: Optional[str] = None):
-        """Initialise."""
-        self._client = CWWiFiClient.sharedWiFiClient()
-        self._interface = self._client.interface()  # Raw interface object
+    Note, this parent class only operates on one interface, the interface named by 'iface', or the current
+    available interface if no interface is named.
+
+    The 'WirelessInterface' object is built once and cached as a snapshot; it is rebuilt when the snapshot
+    is older than 'ttl' seconds, after a 'commit()' or 'power_cycle()', or after an explicit 'refresh()'.
+    Scan results are cached for 'scan_ttl' seconds, as an active scan takes seconds and interrupts traffic."""
+    def __init__(self,
+                 iface: Optional[str] = None,
+                 ttl: int | float = 30,
+                 backend: Optional[Any] = None,
+                 scan_ttl: int | float = 30):
+        """Initialise.
+
+        :param iface: the wireless interface name, for example: 'en1'; defaults to the current interface
+        :param ttl: number of seconds an interface snapshot is considered current
+        :param backend: the backend providing the CoreWLAN objects, defaults to the current backend
+        :param scan_ttl: number of seconds scan results are considered current"""
+        self._backend = backend or get_backend()
+        self._client = self._backend.client()
+        self._interface = self._client.interfaceWithName_(iface) if iface else self._client.interface()  # Raw
+        self._snapshot = None
+        self._snapshot_time = None
+        self._ttl = ttl
+        self._scan_cache = dict()  # (ssid, include_hidden): (time, networks)
+        self._scan_bssids = dict()  # bssid: network, from the cached scans
+        self._scan_ttl = scan_ttl
 
     def __repr__(self):
         attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
         return f"{type(self).__name__}({', '.join(attrvals)})"
 
     # ------------------- Properties via decorated functions ----------------------------------------------------------
+    @property
+    def client(self) -> Any:
+        """Return the 'CWWiFiClient' object."""
+        return self._client
+
     @property
     def interface(self) -> Optional[WirelessInterface]:
-        """Return a WirelessInterface object as a property."""
-        return WirelessInterface(client=self._client, iface=self._interface)
+        """Return a WirelessInterface object as a property; this is a cached snapshot of the interface."""
+        if self._snapshot is None or (monotonic() - self._snapshot_time) > self._ttl:
+            self._snapshot = WirelessInterface(client=self._client, iface=self._interface, backend=self._backend)
+            self._snapshot_time = monotonic()
+
+        return self._snapshot
 
     @property
     def interfaces(self) -> Optional[List[WirelessInterface]]:
         """Return a list of WirelessInterface objects."""
-        return [WirelessInterface(client=self._client, iface=_iface) for _iface in self._client.interfaces()]
+        return [WirelessInterface(client=self._client, iface=_iface, backend=self._backend)
+                for _iface in self._client.interfaces()]
 
     @property
     def valid_interfaces(self) -> Optional[List[str]]:
         """Return a list of valid interface names."""
-        return [iface.name for iface in self.interfaces]
+        return [o2p(_iface.interfaceName()) for _iface in self._client.interfaces()]
 
     # ------------------- Functions -----------------------------------------------------------------------------------
     def associate(self, ssid: str, password: Optional[str] = None) -> Optional[bool]:
@@ -55,28 +99,45 @@ class WLan:
         :param ssid: SSID to associate to
         :param password: optional password (string) to use when associating, if the SSID has previously been
                          associated with and credentials are stored, then this will automatically reconnect"""
-        network = self.scan_for_networks(ssid=ssid)
+        networks = self.scan_for_networks(ssid=ssid)
         domain, code = None, None
 
-        if network:
+        if networks:
+            # Scan results are ranked by RSSI, so this is the strongest BSSID for the SSID
+            network = networks[0].network
             success, result_msg = self._interface.associateToNetwork_password_error_(network, password, None)
+            self.refresh()
 
             if not success:
                 domain, code = result_msg.domain(), result_msg.code()
 
             return (success, domain, code)
 
-    def commit(self, new_order: List[CWNetworkProfile], use_networksetup: bool = False) -> None:
-        """Commit changes to the ordering of the preferred networks.
+    def clear_scan_cache(self) -> None:
+        """Discard all cached scan results so the next scan is an active scan."""
+        self._scan_cache.clear()
+        self._scan_bssids.clear()
+
+    def commit(self,
+               new_order: List[CWNetworkProfile],
+               use_networksetup: bool = False,
+               verify: bool = True) -> None:
+        """Commit changes to the ordering of the preferred networks, as a transaction: the current profiles are
+        kept as a snapshot, the change is applied, and the result is verified against the new order with one
+        read of the configuration. If applying or verifying fails, the changes are rolled back to the snapshot,
+        and 'WLanError' is raised.
+
+        :param new_order: the new order of network profiles to apply
+        :param use_networksetup: apply the new order with 'networksetup' instead of CoreWLAN
+        :param verify: verify the result against the new order"""
+        snapshot = self.interface
+        target = list(dict.fromkeys(snapshot.profile_index.ssids_for(new_order)))
+
+        # Whatever happens below, the configuration on the interface may have changed.
+        self.refresh()
 
-        :param new_order: the new order of network profiles to apply"""
-        # Check we can reorder all specified SSIDs
         if not use_networksetup:
-            nso = NSOrderedSet.orderedSetWithArray_
-            commit = self._interface.commitConfiguration_authorization_error_
-            config = self.interface.mutable_configuration
-            config.setNetworkProfiles_(nso(new_order))
-            success, result = commit(config, None, None)
+            success, result = self._commit_profiles(new_order)
 
             if not success:
                 domain, code = result.domain(), result.code()
@@ -85,81 +146,216 @@ class WLan:
                 if code == -3930 and not geteuid() == 0:
                     print("You may need to run this with 'sudo' to apply this configuration change.", file=sys.stderr)
 
-                sys.exit(1)
-            else:
-                print("Successfully applied configuration change.")
+                raise WLanError("commit")
         else:
-            ssids_added = list()
-            security_map = self.interface.networksetup_security_types_map
-            removed = networksetup.remove_ssids(iface=self.interface.name)
+            positions = snapshot.profile_index.positions
+            security_map = snapshot.networksetup_security_types_map
+            removals, inserts = minimal_moves(list(positions), target)
+            unknown = ", ".join([f"{ssid!r}" for _, ssid in inserts if security_map.get(ssid) == "Unknown"])
+            duplicates = ", ".join([f"{ssid!r}" for ssid in removals if len(positions[ssid]) > 1])
 
-            if removed.returncode == 0:
-                for profile in new_order:
-                    ssid = o2p(profile.ssid())
-                    st = security_map.get(ssid)
-                    index = new_order.index(profile)
+            if unknown:
+                print(f"Error: Cannot re-add SSIDs with an unknown security type: {unknown}", file=sys.stderr)
+                raise WLanError("commit")
 
-                    if not st == "Unknown":
-                        added = networksetup.add_ssids(iface=self.interface.name,
-                                                       ssid=ssid,
-                                                       index=index,
-                                                       security_type=st)
+            # 'networksetup' removes an SSID by name, and could only re-add one of its profiles
+            if duplicates:
+                print(f"Error: Cannot move SSIDs that are saved more than once with 'networksetup': {duplicates}",
+                      file=sys.stderr)
+                print("Remove the duplicate profiles, or apply the change with CoreWLAN.", file=sys.stderr)
+                raise WLanError("commit")
 
-                        if added.returncode == 0:
-                            ssids_added.append(ssid)
+            failed = self._networksetup_moves(snapshot, snapshot.profile_index.ssids, target)
 
-                            if all([o2p(profile.ssid()) in ssids_added for profile in new_order]):
-                                print("Successfully applied configuration change.")
+            if failed:
+                for result in failed:
+                    print(f"Error applying change: {result.stderr}", file=sys.stderr)
 
-    def current_ssid_order(self, output: Optional[TextIO] = sys.stdout) -> None:
-        """Display the current SSID order."""
-        for profile in self.interface.network_profiles:
-            index = self.interface.network_profiles.index(profile)
-            print(f" {index}: {profile.ssid()!r}", file=output)
+                self._rollback(snapshot, use_networksetup=use_networksetup)
+                raise WLanError("commit")
 
-    def power_cycle(self, wait: str | int = 5) -> None:
-        """Power cycles the wireless network interface off then on.
+        if verify and not self._is_ordered(target):
+            print("Error applying change: the SSID order does not match the new order", file=sys.stderr)
+            self._rollback(snapshot, use_networksetup=use_networksetup)
+            raise WLanError("commit")
 
-        :param wait: number of seconds to wait between power off and on"""
-        self.set_power_off()
-        sleep(int(wait))
-        self.set_power_on()
+        print("Successfully applied configuration change.")
 
-    def reorder(self, new_order: List[str]) -> List[CWConfiguration | CWMutableConfiguration]:
+    def current_ssid_order(self, output: Optional[TextIO] = sys.stdout) -> None:
+        """Display the current SSID order."""
+        self.print_ssid_order(self.interface.network_profiles, output=output)
+
+    def print_ssid_order(self, profiles: List[CWNetworkProfile], output: Optional[TextIO] = sys.stdout) -> None:
+        """Display the SSID order of a list of network profiles from the current interface snapshot.
+
+        :param profiles: list of network profiles, for example the result of 'reorder()'"""
+        ssids = self.interface.profile_index.ssids_for(profiles)
+
+        if ssids:
+            print("\n".join(f" {index}: {ssid!r}" for index, ssid in enumerate(ssids)), file=output)
+
+    def ip_addresses(self) -> List[str]:
+        """Return the IPv4 and IPv6 addresses of the wireless interface, leaving out IPv6 link-local addresses
+        (which are assigned without a network); this is read from the interface, not the snapshot."""
+        monitor = self._interface.ipMonitor()
+
+        if monitor is None:
+            return []
+
+        ipv6 = [address for address in o2p(monitor.ipv6Addresses()) or [] if not address.startswith("fe80:")]
+        return (o2p(monitor.ipv4Addresses()) or []) + ipv6
+
+    def is_associated(self) -> bool:
+        """Return True if the wireless interface is associated to a network (the interface state is 'Running');
+        this is read from the interface, not the snapshot."""
+        return INTERFACE_STATES.get(o2p(self._interface.interfaceState())) == "Running"
+
+    def is_powered(self) -> bool:
+        """Return True if the wireless interface power is on; this is read from the interface, not the snapshot."""
+        return bool(self._interface.powerOn())
+
+    def load_cached_scan(self) -> List[WirelessNetwork]:
+        """Replace the cached scan results with the networks CoreWLAN has cached from the most recent scans (by
+        any process), without an active scan; returns all of the networks, including hidden networks."""
+        self.clear_scan_cache()
+        return self._cache_scan((None, True), self._interface.cachedScanResults() or [])
+
+    def order_by_signal(self,
+                        band_bonus: Optional[Dict[str, int | float]] = None,
+                        width_bonus: Optional[Dict[str, int | float]] = None) -> List[str]:
+        """Return the configured SSIDs ordered by the signal of the networks found in one (cached) scan; SSIDs
+        that are not found in the scan follow in their current order. The result can be passed on to 'reorder()'.
+
+        :param band_bonus: score added to the RSSI for each channel band, for example: {'5GHz': 10}
+        :param width_bonus: score added to the RSSI for each channel width, for example: {'80MHz': 2}"""
+        return rank_by_signal(ssids=self.interface.profile_index.ssids,
+                              networks=self.scan_for_networks(),
+                              band_bonus=band_bonus,
+                              width_bonus=width_bonus)
+
+    def power_cycle(self,
+                    wait: int | float = 0,
+                    timeout: int | float = 30,
+                    interval: int | float = 0.05,
+                    max_interval: int | float = 1) -> PowerCycleResult:
+        """Power cycles the wireless network interface off then on, waiting for the interface to report each
+        state rather than for a fixed time: the power to be off, the power to be on, and then (only if they were
+        before the power cycle) for the interface to be associated and to have an IP address. The interface
+        state is checked with an exponential backoff, and all phases share one deadline; the power is always
+        turned back on, even if the interface never reported it as off.
+
+        :param wait: minimum number of seconds to keep the power off, after the interface reports it as off
+        :param timeout: number of seconds all phases must complete in
+        :param interval: number of seconds before the second check of each phase, doubled after each check
+        :param max_interval: maximum number of seconds between checks"""
+        start = monotonic()
+        deadline = start + float(timeout)
+        associated, addressed = self.is_associated(), bool(self.ip_addresses())
+        result = PowerCycleResult()
+
+        def phase(name: str, action: Optional[Any], ready: Any) -> bool:
+            phase_start = monotonic()
+
+            if action:
+                action()
+
+            completed = wait_until(ready, deadline, interval=interval, max_interval=max_interval)
+            result.phases[name] = monotonic() - phase_start
+
+            if not completed and result.timed_out is None:
+                result.timed_out = name
+
+            return completed
+
+        phase("power_off", self.set_power_off, lambda: not self.is_powered())
+
+        if wait:
+            sleep(float(wait))
+
+        if phase("power_on", self.set_power_on, self.is_powered) and associated:
+            if phase("associated", None, self.is_associated) and addressed:
+                phase("addresses", None, lambda: bool(self.ip_addresses()))
+
+        self.refresh()
+        self.clear_scan_cache()
+        result.total = monotonic() - start
+        return result
+
+    def refresh(self) -> None:
+        """Discard the cached interface snapshot so the next access rebuilds it."""
+        self._snapshot = None
+        self._snapshot_time = None
+
+    def reorder(self, new_order: List[str]) -> List[CWNetworkProfile]:
         """Reorder the current list of network profiles.
 
         :param new_order: a list of SSID names (as strings) in the order they will be organised into"""
-        old_order = [o2p(profile.ssid()) for profile in self.interface.network_profiles]
+        interface = self.interface
+        reordered, missing = interface.profile_index.reorder(new_order)
 
-        if not all([ssid in old_order for ssid in new_order]):
-            missing = ", ".join([f"{ssid!r}" for ssid in new_order if ssid not in old_order])
-            msg = f"Error: Cannot re-order the SSIDs as one or more SSID is not configured on {self.interface.name!r}"
+        if missing:
+            missing = ", ".join([f"{ssid!r}" for ssid in missing])
+            msg = f"Error: Cannot re-order the SSIDs as one or more SSID is not configured on {interface.name!r}"
             print(msg, file=sys.stderr)
-            print(f"SSIDs not configured on {self.interface.name!r}: {missing}", file=sys.stderr)
+            print(f"SSIDs not configured on {interface.name!r}: {missing}", file=sys.stderr)
             print("Current SSID order:", file=sys.stderr)
             self.current_ssid_order(output=sys.stderr)
-            sys.exit(2)
+            raise WLanError("reorder", code=2)
 
-        reordered = list()
-        tracking = list()
+        return reordered
 
-        # Process all SSIDs in the 'new_order' param first
-        for ssid in new_order:
-            old_index = old_order.index(ssid)
-            profile = self.interface.network_profiles[old_index]
-            reordered.append(profile)
-            tracking.append(ssid)
+    def scan_for_networks(self,
+                          ssid: Optional[str] = None,
+                          include_hidden: bool = False,
+                          max_age: Optional[int | float] = None) -> List[WirelessNetwork]:
+        """Scan for wireless networks, returning the networks ranked by RSSI (strongest first).
 
-        # Now process any SSIDs from the current profiles that was not included in
-        # the 'new_order' param so existing SSIDs are not arbitrarily removed.
-        for profile in self.interface.network_profiles:
-            ssid = o2p(profile.ssid())
+        Results are cached; a scan for a specific SSID is answered from a current scan for all networks when
+        that scan found the SSID, so back to back scans within 'max_age' seconds only make one active scan.
+        Otherwise the SSID is scanned for directly, which also finds networks that do not broadcast their SSID.
 
-            if ssid not in tracking:
-                reordered.append(profile)
-                tracking.append(ssid)
+        :param ssid: optional SSID name (string) to scan for, all networks are returned if not provided
+        :param include_hidden: include hidden networks (networks that do not broadcast an SSID)
+        :param max_age: number of seconds cached scan results are considered current, defaults to 'scan_ttl',
+                        use 0 to force an active scan"""
+        max_age = self._scan_ttl if max_age is None else max_age
+        now = monotonic()
 
-        return reordered
+        for key in [(ssid, include_hidden), (None, include_hidden), (None, True)]:
+            cached = self._scan_cache.get(key)
+
+            if cached and (now - cached[0]) <= max_age:
+                networks = cached[1]
+
+                if key[0] is None and ssid is not None:
+                    networks = [network for network in networks if network.ssid == ssid]
+
+                if not include_hidden and key[1]:
+                    networks = [network for network in networks if not network.is_hidden]
+
+                # A broader scan that did not find the SSID is not an answer, a directed scan can find networks
+                # that do not broadcast their SSID
+                if networks or key == (ssid, include_hidden):
+                    return networks
+
+        scan = self._interface.scanForNetworksWithName_includeHidden_error_
+        result, error = scan(ssid, include_hidden, None)
+
+        if result is None:
+            if error is not None:
+                print(f"Error scanning for networks: {error.domain()!r}, code {error.code()!r}", file=sys.stderr)
+
+            return []
+
+        return self._cache_scan((ssid, include_hidden), result)
+
+    def scanned_network(self, bssid: str) -> Optional[WirelessNetwork]:
+        """Return the network with the BSSID from the most recent scan results that are not older than
+        'scan_ttl' seconds, if it was found.
+
+        :param bssid: the BSSID (string) of the network, for example: 'a0:b1:c2:d3:e4:f5'"""
+        self._expire_scan_cache()
+        return self._scan_bssids.get(bssid)
 
     def set_power_off(self) -> None:
         """Set the wirless interface power off."""
@@ -168,3 +364,113 @@ class WLan:
     def set_power_on(self) -> None:
         """Set the wirless interface power on."""
         self._interface.setPower_error_(True, None)
+
+    # ------------------- "Private" Functions -------------------------------------------------------------------------
+    def _cache_scan(self, key: Tuple[Optional[str], bool], result: Any) -> List[WirelessNetwork]:
+        """Cache the networks of a scan result, ranked by RSSI (strongest first), and return them.
+
+        :param key: the (ssid, include_hidden) arguments the scan was made with
+        :param result: the 'CWNetwork' objects found by the scan"""
+        networks = sorted([WirelessNetwork(network) for network in result],
+                          key=lambda network: network.rssi if network.rssi is not None else -999,
+                          reverse=True)
+        self._expire_scan_cache()
+        self._scan_cache[key] = (monotonic(), networks)
+        self._scan_bssids.update({network.bssid: network for network in networks if network.bssid})
+        return networks
+
+    def _commit_profiles(self, profiles: List[CWNetworkProfile]) -> Tuple[bool, Any]:
+        """Commit a list of network profiles with CoreWLAN, returning the success flag and the error.
+
+        :param profiles: the network profiles, in order"""
+        config = self._backend.configuration(self._interface.configuration(), mutable=True)
+        config.setNetworkProfiles_(self._backend.ordered_set(profiles))
+        return self._interface.commitConfiguration_authorization_error_(config, None, None)
+
+    def _expire_scan_cache(self) -> None:
+        """Discard the cached scan results that are older than 'scan_ttl' seconds, and rebuild the BSSID map
+        from the scan results that are left, so it never holds networks from expired scans."""
+        now = monotonic()
+        expired = [key for key, (time, _) in self._scan_cache.items() if (now - time) > self._scan_ttl]
+
+        if not expired:
+            return
+
+        for key in expired:
+            del self._scan_cache[key]
+
+        self._scan_bssids.clear()
+
+        for _, networks in sorted(self._scan_cache.values(), key=lambda cached: cached[0]):
+            self._scan_bssids.update({network.bssid: network for network in networks if network.bssid})
+
+    def _is_ordered(self, target: List[str]) -> bool:
+        """Return True if the SSIDs on the interface are in the target order, with one read of the configuration.
+
+        :param target: list of SSID names (as strings), without duplicates"""
+        self.refresh()
+        return list(dict.fromkeys(self.interface.profile_index.ssids)) == target
+
+    def _networksetup_moves(self,
+                            snapshot: WirelessInterface,
+                            current: List[str],
+                            target: List[str],
+                            stop_on_error: bool = True) -> List[networksetup.NetworkSetupOutput]:
+        """Move the SSIDs on the interface into the target order with 'networksetup', removing and re-adding
+        only the SSIDs that change position; returns the failed invocations.
+
+        :param snapshot: interface snapshot with the security types of every SSID in the target order
+        :param current: list of SSID names (as strings) of every profile currently on the interface, in order
+        :param target: list of SSID names (as strings), without duplicates
+        :param stop_on_error: stop after the first failed invocation"""
+        security_map = snapshot.networksetup_security_types_map
+        removals, inserts = minimal_moves(list(dict.fromkeys(current)), target)
+        inserts = saved_insert_indexes(current, removals, inserts)
+
+        executor = networksetup.NetworkSetupExecutor()
+        removes = [networksetup.remove_ssids_invocation(iface=snapshot.name, ssid=ssid) for ssid in removals]
+        failed = [result for result in map(executor.run, removes) if not result.returncode == 0]
+        skipped = 0
+
+        for index, ssid in inserts:
+            if failed and stop_on_error:
+                break
+
+            result = executor.run(networksetup.add_ssids_invocation(iface=snapshot.name,
+                                                                    ssid=ssid,
+                                                                    index=index - skipped,
+                                                                    security_type=security_map.get(ssid)))
+
+            if not result.returncode == 0:
+                failed.append(result)
+                skipped += 1  # the SSIDs inserted after this one are one position further up
+
+        self.refresh()
+        return failed
+
+    def _rollback(self, snapshot: WirelessInterface, use_networksetup: bool = False) -> bool:
+        """Restore the network profiles of a snapshot; with 'networksetup', only the SSIDs that are not in their
+        snapshot position are removed and re-added. Returns True if the snapshot order was restored.
+
+        :param snapshot: the interface snapshot taken before the change
+        :param use_networksetup: restore with 'networksetup' instead of CoreWLAN"""
+        original = list(dict.fromkeys(snapshot.profile_index.ssids))
+
+        if not use_networksetup:
+            self._commit_profiles(snapshot.network_profiles)
+        else:
+            # Keep going after a failure, every SSID that is re-added gets users back on a network
+            self.refresh()
+            self._networksetup_moves(snapshot, self.interface.profile_index.ssids, original, stop_on_error=False)
+
+        if self._is_ordered(original):
+            print("Rolled back to the previous SSID order.", file=sys.stderr)
+            return True
+
+        missing = ", ".join([f"{ssid!r}" for ssid in original if ssid not in self.interface.profile_index])
+        print("Error: Could not roll back to the previous SSID order.", file=sys.stderr)
+
+        if missing:
+            print(f"SSIDs no longer configured on {snapshot.name!r}: {missing}", file=sys.stderr)
+
+        return False
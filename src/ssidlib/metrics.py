@@ -0,0 +1,196 @@
+import math
+import threading
+
+from array import array
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from time import monotonic
+from typing import Any, Dict, Optional
+
+from .corewlan import WLan
+
+# Sampled values, and the 'WirelessSettings' field each one is read from
+METRICS = {"rssi": "rssi_ctl_agr",
+           "noise": "noise_ctl_agr",
+           "tx_rate": "last_tx_rate",
+           "transmit_power": "transmit_power"}
+
+
+@dataclass
+class MetricsEvent:
+    kind: str = field(default=None)  # 'channel' or 'roam'
+    time: float = field(default=None)
+    old: Any = field(default=None)
+    new: Any = field(default=None)
+
+
+class RingBuffer:
+    """Fixed-size ring buffer of floats backed by an 'array'; a missing value is stored as NaN and is left out of
+    the statistics."""
+    def __init__(self, size: int) -> None:
+        """Initialise.
+
+        :param size: the number of values kept, older values are overwritten"""
+        self.size = int(size)
+        self._values = array("d", [math.nan]) * self.size
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self):
+        return f"{type(self).__name__}(size={self.size}, count={self._count})"
+
+    def append(self, value: Optional[int | float]) -> None:
+        """Add a value, overwriting the oldest value when the buffer is full.
+
+        :param value: the value to add, None is stored as NaN"""
+        self._values[self._next] = math.nan if value is None else value
+        self._next = (self._next + 1) % self.size
+        self._count = min(self._count + 1, self.size)
+
+    def values(self) -> array:
+        """Return the values, oldest first, as a new array."""
+        if self._count < self.size:
+            return self._values[:self._count]
+
+        return self._values[self._next:] + self._values[:self._next]
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        """Return the minimum, mean, 95th percentile, and last value, ignoring missing values."""
+        values = sorted(value for value in self.values() if not math.isnan(value))
+
+        if not values:
+            return {"min": None, "mean": None, "p95": None, "last": None}
+
+        last = self._values[(self._next - 1) % self.size]
+        return {"min": values[0],
+                "mean": math.fsum(values) / len(values),
+                "p95": values[max(math.ceil(len(values) * 0.95) - 1, 0)],
+                "last": None if math.isnan(last) else last}
+
+
+class MetricsSampler:
+    """Samples the RSSI, noise, transmit rate, and transmit power of an interface into ring buffers, and records
+    channel changes and roaming events (BSSID changes between two BSSIDs).
+
+    Each sample is one in-process read of the interface (see 'WirelessInterface.native_settings'), so sampling
+    once a second costs microseconds of CPU per sample; the statistics are only computed when asked for. When
+    macOS redacts the BSSID, roams are not seen, unless 'use_airport' is set: the BSSID is then read with the
+    'airport' fallback, which spawns a process every few seconds (see 'airport.GETINFO_TTL')."""
+    def __init__(self,
+                 wlan: WLan,
+                 interval: int | float = 1,
+                 size: int = 3600,
+                 events: int = 1000,
+                 use_airport: bool = False) -> None:
+        """Initialise.
+
+        :param wlan: the WLan object of the interface to sample
+        :param interval: number of seconds between samples when running
+        :param size: number of samples kept, for example 3600 is one hour at the default interval
+        :param events: number of channel change and roaming events kept
+        :param use_airport: use 'airport' for the values CoreWLAN does not report, see 'WirelessInterface.settings'"""
+        self.wlan = wlan
+        self.interval = interval
+        self.size = size
+        self.use_airport = use_airport
+        self.channel_changes = 0
+        self.roams = 0
+        self.events = deque(maxlen=events)
+        self._times = RingBuffer(size)
+        self._buffers = {metric: RingBuffer(size) for metric in METRICS}
+        self._channel = None
+        self._bssid = None
+        self._stopped = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    def sample(self) -> None:
+        """Take one sample."""
+        interface = self.wlan.interface
+        settings = interface.settings if self.use_airport else interface.native_settings
+        now = monotonic()
+
+        with self._lock:
+            self._times.append(now)
+
+            for metric, attr in METRICS.items():
+                self._buffers[metric].append(getattr(settings, attr) if settings else None)
+
+            channel = settings.channel if settings else None
+            bssid = settings.bssid if settings else None
+
+            if channel is not None:
+                if self._channel is not None and not channel == self._channel:
+                    self.channel_changes += 1
+                    self.events.append(MetricsEvent(kind="channel", time=now, old=self._channel, new=channel))
+
+                self._channel = channel
+
+            # Disconnecting is not roaming, the BSSID before the disconnect is kept to compare against
+            if bssid is not None:
+                if self._bssid is not None and not bssid == self._bssid:
+                    self.roams += 1
+                    self.events.append(MetricsEvent(kind="roam", time=now, old=self._bssid, new=bssid))
+
+                self._bssid = bssid
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the rolling minimum, mean, 95th percentile, and last value of each metric over the samples kept,
+        with the number of samples, channel changes, and roaming events."""
+        with self._lock:
+            result = {metric: buffer.stats() for metric, buffer in self._buffers.items()}
+            result.update({"samples": len(self._times), "channel_changes": self.channel_changes, "roams": self.roams})
+
+        return result
+
+    def export(self) -> Dict[str, Any]:
+        """Return all samples kept, oldest first, as lists (one per metric, missing values are None), with the
+        sample times (monotonic seconds) and the events."""
+        with self._lock:
+            result = {"interface": self.wlan.interface.name, "time": self._times.values().tolist()}
+            result.update({metric: [None if math.isnan(value) else value for value in buffer.values()]
+                           for metric, buffer in self._buffers.items()})
+            result["events"] = [asdict(event) for event in self.events]
+
+        return result
+
+    def run(self, samples: Optional[int] = None) -> None:
+        """Take a sample every 'interval' seconds until 'samples' samples have been taken, 'stop()' is called, or
+        the sampler is interrupted. Samples are scheduled from the start time, so they do not drift.
+
+        :param samples: optional number of samples to take"""
+        start, taken = monotonic(), 0
+
+        try:
+            while True:
+                self.sample()
+                taken += 1
+
+                if samples is not None and taken >= samples:
+                    break
+
+                if self._stopped.wait(max(0, start + taken * self.interval - monotonic())):
+                    break
+        except KeyboardInterrupt:
+            pass
+
+    def start(self) -> None:
+        """Run the sampler on a background thread."""
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the sampler, waiting for the background thread if there is one."""
+        self._stopped.set()
+
+        if self._thread:
+            self._thread.join()
+            self._thread = None
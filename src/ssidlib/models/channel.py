@@ -1,28 +1,17 @@
-from CoreWLAN import (CWChannel,
-                      kCWChannelBand2GHz,
-                      kCWChannelBand5GHz,
-                      kCWChannelBandUnknown,
-                      kCWChannelWidth160MHz,
-                      kCWChannelWidth20MHz,
-                      kCWChannelWidth40MHz,
-                      kCWChannelWidth80MHz,
-                      kCWChannelWidthUnknown)
-
-from ..utils.pyobjc import o2p
+from __future__ import annotations
 
+from typing import TYPE_CHECKING
 
-CHANNEL_BANDS = {kCWChannelBand2GHz: "2.4Ghz",
-                 kCWChannelBand5GHz: "5GHz",
-                 kCWChannelBandUnknown: "Unknown"}
+from .constants import CHANNEL_BANDS, CHANNEL_WIDTH
+from ..utils.pyobjc import o2p
 
-CHANNEL_WIDTH = {kCWChannelWidth160MHz: "160MHz",
-                 kCWChannelWidth80MHz: "80MHz",
-                 kCWChannelWidth40MHz: "40MHz",
-                 kCWChannelWidth20MHz: "20MHz",
-                 kCWChannelWidthUnknown: "Unknown"}
+if TYPE_CHECKING:
+    from CoreWLAN import CWChannel  # NOQA
 
 
 class ChannelBand:
+    __slots__ = ("channel", "channel_band", "channel_properties", "channel_width")
+
     def __init__(self, cb: CWChannel) -> None:
         self.channel = o2p(cb.channelNumber())
         self.channel_band = CHANNEL_BANDS.get(o2p(cb.channelBand()))
@@ -30,5 +19,5 @@ class ChannelBand:
         self.channel_width = CHANNEL_WIDTH.get(o2p(cb.channelWidth()))
 
     def __repr__(self):
-        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        attrvals = [f"{k}={getattr(self, k)!r}" for k in self.__slots__ if not k.startswith("_")]
         return f"{type(self).__name__}({', '.join(attrvals)})"
@@ -0,0 +1,98 @@
+"""Lookup tables of the CoreWLAN enum values, built once from the backend constants and shared by the models
+and 'utils/airport.py', so importing one model does not import the others just for their tables."""
+from ..backends import get_backend
+
+CW = get_backend().constants
+
+CHANNEL_BANDS = {CW.kCWChannelBand2GHz: "2.4GHz",
+                 CW.kCWChannelBand5GHz: "5GHz",
+                 CW.kCWChannelBandUnknown: "Unknown"}
+
+CHANNEL_WIDTH = {CW.kCWChannelWidth160MHz: "160MHz",
+                 CW.kCWChannelWidth80MHz: "80MHz",
+                 CW.kCWChannelWidth40MHz: "40MHz",
+                 CW.kCWChannelWidth20MHz: "20MHz",
+                 CW.kCWChannelWidthUnknown: "Unknown"}
+
+INTERFACE_MODES = {CW.kCWInterfaceModeHostAP: "Host AP",
+                   CW.kCWInterfaceModeIBSS: "IBSS",
+                   CW.kCWInterfaceModeNone: "No Mode",
+                   CW.kCWInterfaceModeStation: "Station"}
+
+INTERFACE_STATES = {CW.kCWInterfaceStateAssociating: "Associating",
+                    CW.kCWInterfaceStateAuthenticating: "Authenticating",
+                    CW.kCWInterfaceStateInactive: "Inactive",
+                    CW.kCWInterfaceStateScanning: "Scanning",
+                    CW.kCWInterfaceStateRunning: "Running"}
+
+NETWORKSETUP_SECURITY_MAP = {CW.kCWSecurityDynamicWEP: "8021XWEP",  # This is a guess...
+                             CW.kCWSecurityEnterprise: "8021XWEP",  # This is a guess...
+                             CW.kCWSecurityNone: "OPEN",
+                             CW.kCWSecurityPersonal: "WPA",  # This is a guess...
+                             CW.kCWSecurityUnknown: "OPEN",  # networksetup defaults to open if sec type unknown
+                             CW.kCWSecurityWEP: "WEP",
+                             CW.kCWSecurityWPA2Enterprise: "WPA2E",
+                             CW.kCWSecurityWPA2Personal: "WPA2",
+                             CW.kCWSecurityWPA3Enterprise: "WPA2E",  # WPA3 is not an option for networksetup
+                             CW.kCWSecurityWPA3Personal: "WPA2",  # WPA3 is not an option for networksetup
+                             CW.kCWSecurityWPA3Transition: "WPA2",  # WPA3 is not an option for networksetup
+                             CW.kCWSecurityWPAEnterprise: "WPAE",
+                             CW.kCWSecurityWPAEnterpriseMixed: "WPAE/WPA2E",
+                             CW.kCWSecurityWPAPersonal: "WPA",
+                             CW.kCWSecurityWPAPersonalMixed: "WPA/WPA2"}
+
+OPERATING_MODES = {CW.kCWOpModeStation: "Station",
+                   CW.kCWOpModeIBSS: "IBSS",
+                   CW.kCWOpModeHostAP: "Host AP",
+                   CW.kCWOpModeMonitorMode: "Monitor Mode",
+                   CW.kCWOpNotPermitted: "Not Permitted"}
+
+PHYSICAL_MODES = {CW.kCWPHYMode11a: "802.11a",
+                  CW.kCWPHYMode11b: "802.11b",
+                  CW.kCWPHYMode11g: "802.11g",
+                  CW.kCWPHYMode11n: "802.11n",
+                  CW.kCWPHYMode11ac: "802.11ac",
+                  CW.kCWPHYMode11ax: "802.11ax",
+                  CW.kCWPHYModeNone: "Unknown"}
+
+SECURITY_MODES = {CW.kCWSecurityModeDynamicWEP: "Dynamic WEP",
+                  CW.kCWSecurityModeOpen: "Open",
+                  CW.kCWSecurityModeWEP: "WEP",
+                  CW.kCWSecurityModeWPA2_Enterprise: "WPA2 Enterprise",
+                  CW.kCWSecurityModeWPA2_PSK: "WPA2 Personal",
+                  CW.kCWSecurityModeWPA_Enterprise: "WPA Enterprise",
+                  CW.kCWSecurityModeWPA_PSK: "WPA Personal",
+                  CW.kCWSecurityModeWPS: "WPS"}
+
+SECURITY_TYPES = {CW.kCWSecurityDynamicWEP: "WEP/Dynamic",
+                  CW.kCWSecurityEnterprise: "WPA",
+                  CW.kCWSecurityNone: "Open",
+                  CW.kCWSecurityPersonal: "PSK",
+                  CW.kCWSecurityUnknown: "Unknown",
+                  CW.kCWSecurityWEP: "WEP",
+                  CW.kCWSecurityWPA2Enterprise: "WPA2",
+                  CW.kCWSecurityWPA2Personal: "WPA2 PSK",
+                  CW.kCWSecurityWPA3Enterprise: "WPA3",
+                  CW.kCWSecurityWPA3Personal: "WPA3",
+                  CW.kCWSecurityWPA3Transition: "WPA2/WPA3",
+                  CW.kCWSecurityWPAEnterprise: "WPA",
+                  CW.kCWSecurityWPAEnterpriseMixed: "WPA/Mix",
+                  CW.kCWSecurityWPAPersonal: "WPA PSK",
+                  CW.kCWSecurityWPAPersonalMixed: "WPA PSK/Mix"}
+
+# Values read from 'CWInterface' by 'airport.native_getinfo()', as they appear in the 'airport --getinfo' output
+CHANNEL_WIDTH_MHZ = {CW.kCWChannelWidth20MHz: 20,
+                     CW.kCWChannelWidth40MHz: 40,
+                     CW.kCWChannelWidth80MHz: 80,
+                     CW.kCWChannelWidth160MHz: 160}
+
+INTERFACE_MODES_TEXT = {CW.kCWInterfaceModeHostAP: "hostAP",
+                        CW.kCWInterfaceModeIBSS: "IBSS",
+                        CW.kCWInterfaceModeNone: "none",
+                        CW.kCWInterfaceModeStation: "station"}
+
+INTERFACE_STATES_TEXT = {CW.kCWInterfaceStateAssociating: "associating",
+                         CW.kCWInterfaceStateAuthenticating: "authenticating",
+                         CW.kCWInterfaceStateInactive: "init",
+                         CW.kCWInterfaceStateScanning: "scanning",
+                         CW.kCWInterfaceStateRunning: "running"}
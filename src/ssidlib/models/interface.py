@@ -1,176 +1,190 @@
-from typing import Optional
-
-from CoreWLAN import (CWConfiguration,
-                      CWWiFiClient,
-                      CWInterface,
-                      CWMutableConfiguration,
-                      kCWInterfaceModeHostAP,
-                      kCWInterfaceModeIBSS,
-                      kCWInterfaceModeNone,
-                      kCWInterfaceModeStation,
-                      kCWInterfaceStateAssociating,
-                      kCWInterfaceStateAuthenticating,
-                      kCWInterfaceStateInactive,
-                      kCWInterfaceStateScanning,
-                      kCWInterfaceStateRunning,
-                      kCWOpModeHostAP,
-                      kCWOpModeIBSS,
-                      kCWOpModeMonitorMode,
-                      kCWOpModeStation,
-                      kCWOpNotPermitted,
-                      kCWPHYMode11a,
-                      kCWPHYMode11ac,
-                      kCWPHYMode11ax,
-                      kCWPHYMode11b,
-                      kCWPHYMode11g,
-                      kCWPHYMode11n,
-                      kCWPHYModeNone,
-                      kCWSecurityDynamicWEP,
-                      kCWSecurityEnterprise,
-                      kCWSecurityModeDynamicWEP,
-                      kCWSecurityModeOpen,
-                      kCWSecurityModeWEP,
-                      kCWSecurityModeWPA2_Enterprise,
-                      kCWSecurityModeWPA2_PSK,
-                      kCWSecurityModeWPA_Enterprise,
-                      kCWSecurityModeWPA_PSK,
-                      kCWSecurityModeWPS,
-                      kCWSecurityNone,
-                      kCWSecurityPersonal,
-                      kCWSecurityUnknown,
-                      kCWSecurityWEP,
-                      kCWSecurityWPA2Enterprise,
-                      kCWSecurityWPA2Personal,
-                      kCWSecurityWPA3Enterprise,
-                      kCWSecurityWPA3Personal,
-                      kCWSecurityWPA3Transition,
-                      kCWSecurityWPAEnterprise,
-                      kCWSecurityWPAEnterpriseMixed,
-                      kCWSecurityWPAPersonal,
-                      kCWSecurityWPAPersonalMixed)
+from __future__ import annotations
+
+from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 from .channel import ChannelBand
+from .constants import (INTERFACE_MODES, INTERFACE_STATES, NETWORKSETUP_SECURITY_MAP, OPERATING_MODES, PHYSICAL_MODES,
+                        SECURITY_MODES, SECURITY_TYPES)
+from .profiles import ProfileIndex
+from ..backends import get_backend
 from ..utils import airport
 from ..utils.pyobjc import o2p
+from ..utils.state import fingerprint
 
-INTERFACE_MODES = {kCWInterfaceModeHostAP: "Host AP",
-                   kCWInterfaceModeIBSS: "IBSS",
-                   kCWInterfaceModeNone: "No Mode",
-                   kCWInterfaceModeStation: "Station"}
-
-INTERFACE_STATES = {kCWInterfaceStateAssociating: "Associating",
-                    kCWInterfaceStateAuthenticating: "Authenticating",
-                    kCWInterfaceStateInactive: "Inactive",
-                    kCWInterfaceStateScanning: "Scanning",
-                    kCWInterfaceStateRunning: "Running"}
-
-NETWORKSETUP_SECURITY_MAP = {kCWSecurityDynamicWEP: "8021XWEP",  # This is a guess...
-                             kCWSecurityEnterprise: "8021XWEP",  # This is a guess...
-                             kCWSecurityNone: "OPEN",
-                             kCWSecurityPersonal: "WPA",  # This is a guess...
-                             kCWSecurityUnknown: "OPEN",  # networksetup defaults to open if sec type unknown
-                             kCWSecurityWEP: "WEP",
-                             kCWSecurityWPA2Enterprise: "WPA2E",
-                             kCWSecurityWPA2Personal: "WPA2",
-                             kCWSecurityWPA3Enterprise: "WPA2E",  # WPA3 is not an option for networksetup
-                             kCWSecurityWPA3Personal: "WPA2",  # WPA3 is not an option for networksetup
-                             kCWSecurityWPA3Transition: "WPA2",  # WPA3 is not an option for networksetup
-                             kCWSecurityWPAEnterprise: "WPAE",
-                             kCWSecurityWPAEnterpriseMixed: "WPAE/WPA2E",
-                             kCWSecurityWPAPersonal: "WPA",
-                             kCWSecurityWPAPersonalMixed: "WPA/WPA2"}
-
-OPERATING_MODES = {kCWOpModeStation: "Station",
-                   kCWOpModeIBSS: "IBSS",
-                   kCWOpModeHostAP: "Host AP",
-                   kCWOpModeMonitorMode: "Monitor Mode",
-                   kCWOpNotPermitted: "Not Permitted"}
-
-PHYSICAL_MODES = {kCWPHYMode11a: "802.11a",
-                  kCWPHYMode11b: "802.11b",
-                  kCWPHYMode11g: "802.11g",
-                  kCWPHYMode11n: "802.11n",
-                  kCWPHYMode11ac: "802.11ac",
-                  kCWPHYMode11ax: "802.11ax",
-                  kCWPHYModeNone: "Unknown"}
-
-SECURITY_TYPES = {kCWSecurityDynamicWEP: "WEP/Dynamic",
-                  kCWSecurityEnterprise: "WPA",
-                  kCWSecurityNone: "Open",
-                  kCWSecurityPersonal: "PSK",
-                  kCWSecurityUnknown: "Unknown",
-                  kCWSecurityWEP: "WEP",
-                  kCWSecurityWPA2Enterprise: "WPA2",
-                  kCWSecurityWPA2Personal: "WPA2 PSK",
-                  kCWSecurityWPA3Enterprise: "WPA3",
-                  kCWSecurityWPA3Personal: "WPA3",
-                  kCWSecurityWPA3Transition: "WPA2/WPA3",
-                  kCWSecurityWPAEnterprise: "WPA",
-                  kCWSecurityWPAEnterpriseMixed: "WPA/Mix",
-                  kCWSecurityWPAPersonal: "WPA PSK",
-                  kCWSecurityWPAPersonalMixed: "WPA PSK/Mix"}
-
-SECURITY_MODES = {kCWSecurityModeDynamicWEP: "Dynamic WEP",
-                  kCWSecurityModeOpen: "Open",
-                  kCWSecurityModeWEP: "WEP",
-                  kCWSecurityModeWPA2_Enterprise: "WPA2 Enterprise",
-                  kCWSecurityModeWPA2_PSK: "WPA2 Personal",
-                  kCWSecurityModeWPA_Enterprise: "WPA Enterprise",
-                  kCWSecurityModeWPA_PSK: "WPA Personal",
-                  kCWSecurityModeWPS: "WPS"}
+if TYPE_CHECKING:
+    from CoreWLAN import CWConfiguration, CWInterface, CWMutableConfiguration, CWNetworkProfile, CWWiFiClient  # NOQA
 
 
 class WirelessInterface:
-    def __init__(self, iface: CWInterface, client: CWWiFiClient) -> None:
-        self.active_physical_mode = PHYSICAL_MODES.get(o2p(iface.activePHYMode()), "Unknown")
-        self.available = iface.networkInterfaceAvailable()
-        self.hardware_address = o2p(iface.hardwareAddress())
-        self.ip_monitor = iface.ipMonitor()
-        self.last_network_joined = iface.lastNetworkJoined()
-        self.last_preferred_network_joined = iface.lastPreferredNetworkJoined()
-        self.last_tether_device_joined = iface.lastTetherDeviceJoined()
-        self.mode = INTERFACE_MODES.get((o2p(iface.interfaceMode())), "Unknown")
-        self.name = o2p(iface.interfaceName())
-        self.op_mode = OPERATING_MODES.get(o2p(iface.opMode()), "Unknown")
-        self.physical_mode = PHYSICAL_MODES.get(o2p(iface.phyMode()), "Unknown")
-        self.power = iface.power()
-        self.security_mode = SECURITY_MODES.get(o2p(iface.securityMode()), "Unknown")
-        self.service_active = iface.serviceActive()
-        self.ssid = iface.ssid()
-        self.state = INTERFACE_STATES.get(o2p(iface.interfaceState()), "Unknown")
-        self.transmit_power = o2p(iface.transmitPower())
-        self.tx_rate = o2p(iface.txRate())
-        self.wlan_channel = ChannelBand(iface.wlanChannel())
-
-        # Items that need to init after various standard 'interface' properties
-        self.configuration = self._configuration(client=client)
-        self.ipv4_addresses = o2p(self.ip_monitor.ipv4Addresses())
-        self.ipv4_router = o2p(self.ip_monitor.ipv4Router())
-        self.ipv6_addresses = o2p(self.ip_monitor.ipv6Addresses())
-        self.ipv6_router = o2p(self.ip_monitor.ipv6Router())
-        self.mutable_configuration = self._configuration(client=client, mutable=True)
-        self.network_profiles = list(self.configuration.networkProfiles().array())
+    """Wrapper around a 'CWInterface' object. Attributes are resolved from the interface when first accessed
+    and are then memoized for the lifetime of this object."""
+    def __init__(self, iface: CWInterface, client: CWWiFiClient, backend: Optional[Any] = None) -> None:
+        self._iface = iface
+        self._client = client
+        self._backend = backend or get_backend()
 
     def __repr__(self):
-        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        attrvals = [f"{k}={getattr(self, k)!r}" for k in self._lazy_attributes()]
         return f"{type(self).__name__}({', '.join(attrvals)})"
 
+    # ------------------- Lazy attributes (resolved on first access) --------------------------------------------------
+    @cached_property
+    def active_physical_mode(self) -> str:
+        return PHYSICAL_MODES.get(o2p(self._iface.activePHYMode()), "Unknown")
+
+    @cached_property
+    def available(self) -> bool:
+        return self._iface.networkInterfaceAvailable()
+
+    @cached_property
+    def configuration(self) -> Optional[CWConfiguration]:
+        return self._configuration()
+
+    @cached_property
+    def hardware_address(self) -> Optional[str]:
+        return o2p(self._iface.hardwareAddress())
+
+    @cached_property
+    def ip_monitor(self) -> Any:
+        return self._iface.ipMonitor()
+
+    @cached_property
+    def ipv4_addresses(self) -> Optional[List[str]]:
+        return o2p(self.ip_monitor.ipv4Addresses())
+
+    @cached_property
+    def ipv4_router(self) -> Optional[str]:
+        return o2p(self.ip_monitor.ipv4Router())
+
+    @cached_property
+    def ipv6_addresses(self) -> Optional[List[str]]:
+        return o2p(self.ip_monitor.ipv6Addresses())
+
+    @cached_property
+    def ipv6_router(self) -> Optional[str]:
+        return o2p(self.ip_monitor.ipv6Router())
+
+    @cached_property
+    def last_network_joined(self) -> Any:
+        return self._iface.lastNetworkJoined()
+
+    @cached_property
+    def last_preferred_network_joined(self) -> Any:
+        return self._iface.lastPreferredNetworkJoined()
+
+    @cached_property
+    def last_tether_device_joined(self) -> Any:
+        return self._iface.lastTetherDeviceJoined()
+
+    @cached_property
+    def mode(self) -> str:
+        return INTERFACE_MODES.get((o2p(self._iface.interfaceMode())), "Unknown")
+
+    @cached_property
+    def mutable_configuration(self) -> Optional[CWMutableConfiguration]:
+        return self._configuration(mutable=True)
+
+    @cached_property
+    def name(self) -> Optional[str]:
+        return o2p(self._iface.interfaceName())
+
+    @cached_property
+    def network_profiles(self) -> List[Any]:
+        # Read straight from the interface configuration, a copy is only needed to change the configuration
+        return list(self._iface.configuration().networkProfiles().array())
+
+    @cached_property
+    def profile_index(self) -> ProfileIndex:
+        return ProfileIndex(self.network_profiles)
+
+    @cached_property
+    def profiles_fingerprint(self) -> str:
+        # CWNetworkProfile does not expose the auto-join state, so SSID, security type, and order are used
+        return fingerprint([[ssid, o2p(profile.security())]
+                            for ssid, profile in zip(self.profile_index.ssids, self.network_profiles)])
+
+    @cached_property
+    def op_mode(self) -> str:
+        return OPERATING_MODES.get(o2p(self._iface.opMode()), "Unknown")
+
+    @cached_property
+    def physical_mode(self) -> str:
+        return PHYSICAL_MODES.get(o2p(self._iface.phyMode()), "Unknown")
+
+    @cached_property
+    def power(self) -> bool:
+        return self._iface.power()
+
+    @cached_property
+    def security_mode(self) -> str:
+        return SECURITY_MODES.get(o2p(self._iface.securityMode()), "Unknown")
+
+    @cached_property
+    def service_active(self) -> bool:
+        return self._iface.serviceActive()
+
+    @cached_property
+    def ssid(self) -> Optional[str]:
+        return self._iface.ssid()
+
+    @cached_property
+    def state(self) -> str:
+        return INTERFACE_STATES.get(o2p(self._iface.interfaceState()), "Unknown")
+
+    @cached_property
+    def transmit_power(self) -> Optional[int]:
+        return o2p(self._iface.transmitPower())
+
+    @cached_property
+    def tx_rate(self) -> Optional[int | float]:
+        return o2p(self._iface.txRate())
+
+    @cached_property
+    def wlan_channel(self) -> ChannelBand:
+        return ChannelBand(self._iface.wlanChannel())
+
     # ------------------- Properties (as decorated functions) ---------------------------------------------------------
     @property
     def bssid(self) -> Optional[str]:
         """Return the BSSID of the currently connected SSID."""
-        return airport.getinfo().bssid
+        info = self.settings
+        return info.bssid if info else None
+
+    @property
+    def noise(self) -> Optional[int]:
+        """Return the current noise measurement (dBm)."""
+        info = self.settings
+        return info.noise_ctl_agr if info else None
+
+    @property
+    def rssi(self) -> Optional[int]:
+        """Return the current aggregate RSSI (dBm)."""
+        info = self.settings
+        return info.rssi_ctl_agr if info else None
+
+    @property
+    def native_settings(self) -> Optional[airport.WirelessSettings]:
+        """Return the current wireless status info, read from the interface only (never from 'airport'); the
+        BSSID is None when macOS redacts it. This is read on each access, as it changes all the time."""
+        return airport.native_getinfo(self._iface)
+
+    @property
+    def settings(self) -> Optional[airport.WirelessSettings]:
+        """Return the current wireless status info, read from the interface (with 'airport' as the fallback);
+        this is read on each access, as it changes all the time."""
+        return airport.getinfo(iface=self._iface)
 
     @property
     def channel(self) -> Optional[int | str]:
         """Return the current channel number."""
-        return self.wlan_channel().channel
+        return self.wlan_channel.channel
 
     @property
     def channel_band(self) -> Optional[str]:
         """Return the current channel band, for example: '5GHz'."""
         try:
-            return self.wlan_channel().channel_band
+            return self.wlan_channel.channel_band
         except KeyError:
             return "Unknown"
 
@@ -178,23 +192,73 @@ class WirelessInterface:
     def channel_width(self) -> Optional[str]:
         """Return the current channel width, for example: '40MHz'."""
         try:
-            return self.wlan_channel().channel_width
+            return self.wlan_channel.channel_width
         except KeyError:
             return "Unknown"
 
     @property
     def networksetup_security_types_map(self):
         """Map the raw security value for all network profiles on this interface for use
-        with the 'networksetup' based re-ordering process if required."""
-        return {o2p(p.ssid()): NETWORKSETUP_SECURITY_MAP.get(o2p(p.security()), "Unknown")
-                for p in self.network_profiles}
+        with the 'networksetup' based re-ordering process if required; an SSID saved more
+        than once maps to the security of its first (highest priority) profile, the same
+        profile as 'ProfileIndex.profile()'."""
+        index = self.profile_index
+        return {ssid: NETWORKSETUP_SECURITY_MAP.get(o2p(index.profile(ssid).security()), "Unknown")
+                for ssid in index.positions}
+
+    # ------------------- Functions -----------------------------------------------------------------------------------
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the interface state and its network profiles as a dictionary of native Python data types, for
+        example for the '--dump' output."""
+        return {"name": self.name,
+                "hardware_address": self.hardware_address,
+                "available": bool(self.available),
+                "power": bool(self.power),
+                "service_active": bool(self.service_active),
+                "state": self.state,
+                "mode": self.mode,
+                "op_mode": self.op_mode,
+                "physical_mode": self.physical_mode,
+                "active_physical_mode": self.active_physical_mode,
+                "security_mode": self.security_mode,
+                "ssid": o2p(self.ssid),
+                "channel": self.channel,
+                "channel_band": self.channel_band,
+                "channel_width": self.channel_width,
+                "transmit_power": self.transmit_power,
+                "tx_rate": self.tx_rate,
+                "ipv4_addresses": self.ipv4_addresses,
+                "ipv4_router": self.ipv4_router,
+                "ipv6_addresses": self.ipv6_addresses,
+                "ipv6_router": self.ipv6_router,
+                "profiles": self.profiles_as_dicts()}
+
+    def profiles_as_dicts(self, profiles: Optional[List[CWNetworkProfile]] = None) -> List[Dict[str, Any]]:
+        """Return the position, SSID, and security type of network profiles as dictionaries.
+
+        :param profiles: optional list of network profiles, for example the result of 'WLan.reorder()', defaults
+                         to the network profiles of the interface"""
+        profiles = self.network_profiles if profiles is None else profiles
+        ssids = self.profile_index.ssids_for(profiles)
+        result = list()
+
+        for index, (ssid, profile) in enumerate(zip(ssids, profiles)):
+            security = o2p(profile.security())
+            result.append({"index": index,
+                           "ssid": ssid,
+                           "security": SECURITY_TYPES.get(security, "Unknown"),
+                           "networksetup_security": NETWORKSETUP_SECURITY_MAP.get(security, "Unknown")})
+
+        return result
 
     # ------------------- "Private" Functions -------------------------------------------------------------------------
-    def _configuration(self,
-                       client: CWWiFiClient,
-                       mutable: bool = False) -> Optional[CWConfiguration | CWMutableConfiguration]:
+    def _configuration(self, mutable: bool = False) -> Optional[CWConfiguration | CWMutableConfiguration]:
         """Return the current interface configuration as either an immutable or mutable configuration object.
 
         :param mutable: boolean flag to return an immutable (False) or mutable (True) configuration object"""
-        conf = CWConfiguration if not mutable else CWMutableConfiguration
-        return conf.alloc().initWithConfiguration_(client.interface().configuration())
+        return self._backend.configuration(self._iface.configuration(), mutable=mutable)
+
+    @classmethod
+    def _lazy_attributes(cls) -> List[str]:
+        """Return the names of all attributes that are resolved on first access, in definition order."""
+        return [k for k, v in vars(cls).items() if isinstance(v, cached_property)]
@@ -1,39 +1,54 @@
-from CoreWLAN import (CWNetwork,
-                      CWNetworkProfile)
+from __future__ import annotations
 
-from .channel import ChannelBand
-from .interface import SECURITY_MODES
+from typing import TYPE_CHECKING
+
+from .constants import CHANNEL_BANDS, CHANNEL_WIDTH, SECURITY_MODES
 from ..utils.pyobjc import o2p
 
+if TYPE_CHECKING:
+    from CoreWLAN import CWNetwork, CWNetworkProfile  # NOQA
+
 
 class NetworkProfile:
+    __slots__ = ("ssid",)
+
     def __init__(self, np: CWNetworkProfile) -> None:
         self.ssid = o2p(np.ssid())
 
     def __repr__(self):
-        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        attrvals = [f"{k}={getattr(self, k)!r}" for k in self.__slots__ if not k.startswith("_")]
         return f"{type(self).__name__}({', '.join(attrvals)})"
 
 
 class WirelessNetwork:
+    # Scans in dense offices return hundreds of networks, slots keep each one small
+    __slots__ = ("channel", "channel_band", "channel_properties", "channel_width", "country_code", "bssid", "rssi",
+                 "security", "ssid", "is_hidden", "_network")
+
     def __init__(self, wn: CWNetwork) -> None:
-        self._cb = ChannelBand(cb=wn.wlanChannel())
-        self.channel = self._cb.channel
-        self.channel_band = self._cb.channel_band
-        self.channel_properties = o2p(self._cb.channel_properties)
-        self.channel_width = self._cb.channel_width
+        # The channel is read directly rather than through a 'ChannelBand', one less object per scanned network
+        cb = wn.wlanChannel()
+        self.channel = o2p(cb.channelNumber())
+        self.channel_band = CHANNEL_BANDS.get(o2p(cb.channelBand()))
+        self.channel_properties = o2p(cb.channelProperties())
+        self.channel_width = CHANNEL_WIDTH.get(o2p(cb.channelWidth()))
         self.country_code = None
         self.bssid = o2p(wn.bssid())
-        self.rssi = o2p(wn.rssi())
+        self.rssi = o2p(wn.rssiValue())
         self.security = SECURITY_MODES.get(o2p(wn.securityMode()), "Unknown")
         self.ssid = o2p(wn.ssid())
         self.is_hidden = self.ssid is None
+        self._network = wn
 
     def __repr__(self):
-        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
-        print(f"{type(self).__name__}({', '.join(attrvals)})")
+        attrvals = [f"{k}={getattr(self, k)!r}" for k in self.__slots__ if not k.startswith("_")]
         return f"{type(self).__name__}({', '.join(attrvals)})"
 
     def __str__(self):
         return (f"{self.ssid!r} ({self.channel_band}), channel {self.channel} ({self.channel_width} width),"
                 f" RSSI {self.rssi}dBm, {self.security}")
+
+    @property
+    def network(self) -> CWNetwork:
+        """Return the 'CWNetwork' object this network was built from."""
+        return self._network
@@ -0,0 +1,53 @@
+from typing import Any, List, Optional, Tuple
+
+from ..utils.ordering import reorder_positions, ssid_positions
+from ..utils.pyobjc import o2p, o2p_many
+
+
+class ProfileIndex:
+    """Index of the network profiles of an interface, built once per interface snapshot.
+    The SSID of each profile is converted once, and positions are looked up from a dictionary rather than by
+    searching the list of profiles."""
+    def __init__(self, profiles: List[Any]) -> None:
+        self.profiles = profiles
+        self.ssids = o2p_many(profile.ssid() for profile in profiles)
+        self.positions = ssid_positions(self.ssids)
+        self._ssid_by_id = {id(profile): ssid for profile, ssid in zip(profiles, self.ssids)}
+
+    def __contains__(self, ssid: str) -> bool:
+        return ssid in self.positions
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(ssids={self.ssids!r})"
+
+    def profile(self, ssid: str) -> Optional[Any]:
+        """Return the first (highest priority) network profile with the SSID name.
+
+        :param ssid: SSID name (string)"""
+        positions = self.positions.get(ssid)
+        return self.profiles[positions[0]] if positions else None
+
+    def reorder(self, new_order: List[str]) -> Tuple[List[Any], List[str]]:
+        """Return a tuple of the reordered network profiles, and any SSIDs that are not configured.
+
+        :param new_order: a list of SSID names (as strings) in the order they will be organised into"""
+        positions, missing = reorder_positions(self.ssids, new_order, positions=self.positions)
+        return ([self.profiles[index] for index in positions], missing)
+
+    def ssid(self, profile: Any) -> Optional[str]:
+        """Return the converted SSID name of a network profile in this index.
+
+        :param profile: network profile object"""
+        try:
+            return self._ssid_by_id[id(profile)]
+        except KeyError:
+            return o2p(profile.ssid())
+
+    def ssids_for(self, profiles: List[Any]) -> List[str]:
+        """Return the converted SSID names for a list of network profiles.
+
+        :param profiles: list of network profile objects"""
+        return [self.ssid(profile) for profile in profiles]
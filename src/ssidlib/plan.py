@@ -0,0 +1,194 @@
+"""Offline planning of SSID reorders over exported profile lists, for example to check the effect of a new
+SSID order across a fleet before pushing it.
+
+Each export file is JSON or a property list (XML or binary) for one host, in any of these layouts:
+    - the '-l --format json|plist' output: {"interface": "en0", "profiles": [{"ssid": "Columbus"}, ...]}
+    - the '--dump --format json|plist' output: {"interfaces": [{"name": "en0", "profiles": [...]}, ...]}
+    - a list of profiles or SSID names: ["Columbus", "Dartanian", ...]
+A "host" (or "hostname") key at the top level names the host, otherwise the file name (without the suffix)
+is used.
+
+This module only uses the ordering functions in 'utils/ordering.py', so it runs without CoreWLAN, on any
+platform."""
+import argparse
+import json
+import plistlib
+import sys
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .utils.ordering import minimal_moves, reorder_positions
+
+EXPORT_SUFFIXES = [".json", ".plist"]
+
+
+def plan_order(ssids: List[str], new_order: List[str]) -> Dict[str, Any]:
+    """Return the plan for one list of SSIDs: the new order, the SSIDs that move, and the SSIDs of 'new_order'
+    that are missing; this is the same reorder as 'WLan.reorder()'.
+
+    :param ssids: list of SSID names (as strings) in their current order
+    :param new_order: list of SSID names (as strings) in the order they will be organised into"""
+    positions, missing = reorder_positions(ssids, new_order)
+
+    if missing:
+        return {"status": "missing", "missing": missing, "moves": [], "current": ssids, "new": []}
+
+    new = [ssids[index] for index in positions]
+    removals, inserts = minimal_moves(list(dict.fromkeys(ssids)), list(dict.fromkeys(new)))
+    status = "changed" if inserts else "unchanged"
+    return {"status": status, "missing": [], "moves": [ssid for _, ssid in inserts], "current": ssids, "new": new}
+
+
+def _profile_ssids(profiles: List[Any]) -> List[str]:
+    """Return the SSIDs of a list of exported profiles, which are either SSID names or dictionaries with an
+    'ssid' key, in their exported order ('index' is used when it is present)."""
+    if profiles and isinstance(profiles[0], dict):
+        profiles = sorted(profiles, key=lambda profile: profile.get("index", 0))
+        return [str(profile["ssid"]) for profile in profiles]
+
+    return [str(profile) for profile in profiles]
+
+
+def load_export(path: str | Path) -> Tuple[str, List[Tuple[str, List[str]]]]:
+    """Load an exported profile list, returning the host name and a list of (interface, SSIDs) tuples.
+
+    :param path: path of the export file"""
+    path = Path(path)
+    data = path.read_bytes()
+    export = json.loads(data) if data.lstrip()[:1] in [b"{", b"["] else plistlib.loads(data)
+    host = path.stem
+
+    if isinstance(export, list):
+        return (host, [(None, _profile_ssids(export))])
+
+    if not isinstance(export, dict):
+        raise ValueError("export is not a list or a dictionary")
+
+    host = str(export.get("host") or export.get("hostname") or host)
+
+    if "interfaces" in export:
+        return (host, [(interface.get("name"), _profile_ssids(interface.get("profiles", [])))
+                       for interface in export["interfaces"]])
+
+    if "profiles" in export:
+        return (host, [(export.get("interface"), _profile_ssids(export["profiles"]))])
+
+    raise ValueError("export has no 'profiles' or 'interfaces'")
+
+
+def plan_file(path: str | Path, new_order: List[str]) -> List[Dict[str, Any]]:
+    """Return the plan for each interface in one export file; a file that cannot be read has one result with
+    the 'error' status. This runs in the worker processes of 'plan()'.
+
+    :param path: path of the export file
+    :param new_order: list of SSID names (as strings) in the order they will be organised into"""
+    try:
+        host, interfaces = load_export(path)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError, plistlib.InvalidFileException) as e:
+        return [{"host": Path(path).stem, "interface": None, "file": str(path), "status": "error", "error": str(e)}]
+
+    return [{"host": host, "interface": interface, "file": str(path), **plan_order(ssids, new_order)}
+            for interface, ssids in interfaces]
+
+
+def export_files(paths: Iterable[str | Path]) -> Iterator[Path]:
+    """Yield the export files; directories are searched (recursively) for '.json' and '.plist' files.
+
+    :param paths: file and directory paths"""
+    for path in map(Path, paths):
+        if path.is_dir():
+            yield from sorted(p for p in path.rglob("*") if p.suffix in EXPORT_SUFFIXES and p.is_file())
+        else:
+            yield path
+
+
+def plan(paths: Iterable[str | Path],
+         new_order: List[str],
+         max_workers: Optional[int] = None,
+         chunksize: int = 64) -> Iterator[Dict[str, Any]]:
+    """Plan the new order for every export file in a process pool, yielding the results in file order as they
+    are ready, so results can be written out while later files are still being planned.
+
+    :param paths: file and directory paths, see 'export_files()'
+    :param new_order: list of SSID names (as strings) in the order they will be organised into
+    :param max_workers: number of worker processes, defaults to the number of CPUs
+    :param chunksize: number of files sent to a worker process at a time"""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for results in executor.map(partial(plan_file, new_order=new_order), export_files(paths), chunksize=chunksize):
+            yield from results
+
+
+def _text(result: Dict[str, Any]) -> str:
+    """Format one result as text."""
+    name = f"{result['host']} ({result['interface']})" if result["interface"] else result["host"]
+
+    if result["status"] == "error":
+        return f"{name}: error: {result['error']}"
+    elif result["status"] == "missing":
+        return f"{name}: SSIDs not configured: {', '.join(repr(ssid) for ssid in result['missing'])}"
+    elif result["status"] == "changed":
+        return f"{name}: changed, moves: {', '.join(repr(ssid) for ssid in result['moves'])}"
+
+    return f"{name}: unchanged"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """The 'plan' subcommand; returns 1 if any host is missing SSIDs or could not be read, otherwise 0."""
+    parser = argparse.ArgumentParser(prog="ssidshuffle plan",
+                                     description=("Work out the effect of a new SSID order on exported profile\n"
+                                                  "lists (one JSON or plist file per host), without CoreWLAN."),
+                                     formatter_class=argparse.RawTextHelpFormatter)
+    a = parser.add_argument
+
+    a("-s", "--ssids",
+      nargs="+",
+      dest="ssids",
+      metavar="[ssid]",
+      required=True,
+      help="SSID names in the order to plan, as with 'ssidshuffle -s'")
+
+    a("-p", "--paths",
+      nargs="+",
+      dest="paths",
+      metavar="[path]",
+      required=True,
+      help=("export files, or directories to search for '.json' and\n"
+            "'.plist' export files"))
+
+    a("--format",
+      dest="format",
+      choices=["text", "ndjson"],
+      default="text",
+      help="the output format, one line per host and interface (default: 'text')")
+
+    a("--changes-only",
+      action="store_true",
+      dest="changes_only",
+      help="only output hosts that change, are missing SSIDs, or have errors")
+
+    a("--workers",
+      dest="workers",
+      type=int,
+      metavar="[n]",
+      help="number of worker processes (default: the number of CPUs)")
+
+    args = parser.parse_args(argv)
+    counts = dict()
+
+    for result in plan(args.paths, new_order=args.ssids, max_workers=args.workers):
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+        if args.changes_only and result["status"] == "unchanged":
+            continue
+
+        if args.format == "ndjson":
+            print(json.dumps(result, separators=(",", ":"), ensure_ascii=False))
+        else:
+            print(_text(result))
+
+    summary = ", ".join(f"{count} {status}" for status, count in sorted(counts.items()))
+    print(f"Planned {sum(counts.values())} interfaces: {summary or 'no export files found'}", file=sys.stderr)
+    return 1 if counts.get("missing") or counts.get("error") else 0
@@ -0,0 +1,213 @@
+import json
+import plistlib
+import sys
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .backends import get_backend
+from .corewlan import WLan, WLanError
+from .utils.ordering import BANDS, channel_band
+from .utils.state import AppliedState, fingerprint
+
+
+DEFAULT_RULE = "default"
+ORDER_BY = ["rssi"]
+
+
+@dataclass
+class InterfacePolicy:
+    """The order rule for one interface: either a fixed list of SSIDs, or 'order_by' a scan."""
+    ssids: List[str] = field(default_factory=list)
+    order_by: Optional[str] = field(default=None)
+    prefer_band: str = field(default="5GHz")
+    band_bonus: int | float = field(default=10)
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """Return the fingerprint used to record a fixed SSID order in the state file; signal based orders
+        change with every scan, so they have no fingerprint."""
+        return None if self.order_by else fingerprint(["ssids", self.ssids])
+
+    def order(self, wlan: WLan) -> List[str]:
+        """Return the list of SSID names (as strings) in the order this rule applies to the interface.
+
+        :param wlan: the WLan object of the interface"""
+        if self.order_by:
+            return wlan.order_by_signal(band_bonus={self.prefer_band: self.band_bonus})
+
+        return self.ssids
+
+
+@dataclass
+class PolicyResult:
+    """The outcome of applying a policy to one interface; 'status' is one of 'applied', 'unchanged',
+    'would apply', 'missing' (SSIDs in the rule are not configured), or 'failed'."""
+    interface: str = field(default=None)
+    status: str = field(default=None)
+    ssids: List[str] = field(default_factory=list)
+    missing: List[str] = field(default_factory=list)
+
+
+def _rule(rule: Dict[str, Any], name: str) -> InterfacePolicy:
+    """Validate and convert one rule of a policy file.
+
+    :param rule: the rule as loaded from the policy file
+    :param name: the interface name (or 'default') of the rule, used in error messages"""
+    if not isinstance(rule, dict):
+        raise ValueError(f"rule for {name!r} must be a dictionary")
+
+    unknown = set(rule) - {"ssids", "order_by", "prefer_band", "band_bonus"}
+    ssids, order_by = rule.get("ssids"), rule.get("order_by")
+
+    if unknown:
+        raise ValueError(f"rule for {name!r} has unknown keys: {', '.join(sorted(unknown))}")
+
+    if bool(ssids) == bool(order_by):
+        raise ValueError(f"rule for {name!r} needs either 'ssids' or 'order_by'")
+
+    if ssids and not (isinstance(ssids, list) and all(isinstance(ssid, str) for ssid in ssids)):
+        raise ValueError(f"'ssids' for {name!r} must be a list of SSID names")
+
+    if order_by and order_by not in ORDER_BY:
+        raise ValueError(f"'order_by' for {name!r} must be one of: {', '.join(ORDER_BY)}")
+
+    if "prefer_band" in rule:
+        try:
+            rule = {**rule, "prefer_band": channel_band(rule["prefer_band"])}
+        except ValueError:
+            raise ValueError(f"'prefer_band' for {name!r} must be one of: {', '.join(BANDS)}") from None
+
+    return InterfacePolicy(**rule)
+
+
+def load_policy(path: str | Path) -> Dict[str, InterfacePolicy]:
+    """Load a policy file, returning the rule for each interface name; the rule for interfaces that are not
+    named in the policy is keyed 'default'. The policy file is either JSON or a property list (XML or binary):
+
+        {"interfaces": {"en0": {"ssids": ["Columbus", "Dartanian"]},
+                        "en7": {"order_by": "rssi", "prefer_band": "5GHz", "band_bonus": 10}},
+         "default": {"ssids": ["Columbus"]}}
+
+    :param path: path of the policy file"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    try:
+        policy = json.loads(data) if data.lstrip().startswith(b"{") else plistlib.loads(data)
+    except (ValueError, plistlib.InvalidFileException) as e:
+        raise ValueError(f"cannot read policy file {str(path)!r}: {e}")
+
+    if not isinstance(policy, dict) or not isinstance(policy.get("interfaces", dict()), dict):
+        raise ValueError(f"policy file {str(path)!r} must contain an 'interfaces' dictionary")
+
+    rules = {name: _rule(rule, name) for name, rule in policy.get("interfaces", dict()).items()}
+
+    if DEFAULT_RULE in policy:
+        rules[DEFAULT_RULE] = _rule(policy[DEFAULT_RULE], DEFAULT_RULE)
+
+    if not rules:
+        raise ValueError(f"policy file {str(path)!r} has no rules")
+
+    return rules
+
+
+def apply_policy(rules: Dict[str, InterfacePolicy],
+                 interfaces: Optional[List[str]] = None,
+                 use_networksetup: bool = False,
+                 dry_run: bool = False,
+                 state: Optional[AppliedState] = None,
+                 force: bool = False,
+                 backend: Optional[Any] = None,
+                 max_workers: Optional[int] = None) -> List[PolicyResult]:
+    """Apply the policy rules to each wireless interface in one run, working on the interfaces concurrently.
+    One 'WLan' object (and interface snapshot) is built for each interface with a rule; interfaces without a
+    rule, and no 'default' rule, are left alone. Results are returned in interface order.
+
+    :param rules: the rule for each interface name, as returned by 'load_policy()'
+    :param interfaces: optional list of interface names to limit the policy to, defaults to all interfaces
+    :param use_networksetup: apply changes with 'networksetup' instead of CoreWLAN
+    :param dry_run: work out the new orders without applying them
+    :param state: optional state, fixed SSID orders recorded as applied are skipped, and orders that are
+                  applied (or already in place) are recorded
+    :param force: apply fixed SSID orders even if the state records them as applied
+    :param backend: the backend providing the CoreWLAN objects, defaults to the current backend
+    :param max_workers: the maximum number of interfaces to work on at once, defaults to all of them"""
+    backend = backend or get_backend()
+    names = [name for name in WLan(backend=backend).valid_interfaces if interfaces is None or name in interfaces]
+    work = [(WLan(iface=name, backend=backend), rules.get(name, rules.get(DEFAULT_RULE))) for name in names]
+    work = [(wlan, rule) for wlan, rule in work if rule]
+    results = [None] * len(work)
+    pending = list()
+
+    for index, (wlan, rule) in enumerate(work):
+        name, policy = wlan.interface.name, rule.fingerprint
+
+        if state and policy and not force and state.is_applied(name, policy, wlan.interface.profiles_fingerprint):
+            results[index] = PolicyResult(interface=name, status="unchanged", ssids=wlan.interface.profile_index.ssids)
+        else:
+            pending.append(index)
+
+    def apply(wlan: WLan, rule: InterfacePolicy) -> PolicyResult:
+        interface = wlan.interface
+        new_order, missing = interface.profile_index.reorder(rule.order(wlan))
+        result = PolicyResult(interface=interface.name, ssids=interface.profile_index.ssids_for(new_order))
+
+        if missing:
+            result.status, result.missing = "missing", missing
+        elif new_order == interface.network_profiles:
+            result.status = "unchanged"
+        elif dry_run:
+            result.status = "would apply"
+        else:
+            try:
+                wlan.commit(new_order=new_order, use_networksetup=use_networksetup)
+                result.status = "applied"
+            except WLanError:
+                # 'commit()' has already printed why it failed
+                result.status = "failed"
+
+        return result
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers or len(pending)) as executor:
+            futures = {index: executor.submit(apply, *work[index]) for index in pending}
+
+            for index, future in futures.items():
+                results[index] = future.result()
+
+    # The state file is written from this thread only, once every interface is done
+    for (wlan, rule), result in zip(work, results):
+        if state and rule.fingerprint and result.status in ["applied", "unchanged"]:
+            wlan.refresh()
+            interface = wlan.interface
+
+            # Only record the policy if the change is actually visible in the network profiles
+            if interface.profile_index.reorder(rule.ssids)[0] == interface.network_profiles:
+                state.record(interface.name, rule.fingerprint, interface.profiles_fingerprint)
+
+    return results
+
+
+def print_results(results: List[PolicyResult], output: Any = sys.stdout) -> None:
+    """Print the outcome of a policy run, one interface at a time.
+
+    :param results: the results returned by 'apply_policy()'
+    :param output: file object messages are written to"""
+    lines = list()
+
+    for result in results:
+        if result.status == "missing":
+            missing = ", ".join([f"{ssid!r}" for ssid in result.missing])
+            lines.append(f"{result.interface}: SSIDs not configured: {missing}")
+            continue
+
+        lines.append(f"{result.interface}: {result.status}")
+
+        if result.status == "would apply":
+            lines.extend(f" {index}: {ssid!r}" for index, ssid in enumerate(result.ssids))
+
+    if lines:
+        print("\n".join(lines), file=output)
@@ -1,26 +1,68 @@
-import plistlib
+from __future__ import annotations
+
+import base64
+import os
 import subprocess
 import sys
 
-from dataclasses import dataclass, field  # make_dataclass
+from dataclasses import dataclass, field, fields  # make_dataclass
 from os import geteuid
-from typing import List, Optional
-
-from CoreWLAN import (kCWOpModeHostAP,
-                      kCWOpModeIBSS,
-                      kCWOpModeMonitorMode,
-                      kCWOpModeStation,
-                      kCWOpNotPermitted)
-
-
-OPERATING_MODES = {kCWOpModeStation: "Station",
-                   kCWOpModeIBSS: "IBSS",
-                   kCWOpModeHostAP: "Host AP",
-                   kCWOpModeMonitorMode: "Monitor Mode",
-                   kCWOpNotPermitted: "Not Permitted"}
-
-
-@dataclass
+from time import monotonic, perf_counter
+from typing import TYPE_CHECKING, Any, Container, Dict, Iterator, List, Optional
+from xml.etree import ElementTree
+
+from .profiling import profiled, record
+from .ordering import channel_band
+from .pyobjc import o2p
+from ..models.constants import CHANNEL_WIDTH_MHZ, INTERFACE_MODES_TEXT, INTERFACE_STATES_TEXT, OPERATING_MODES
+
+if TYPE_CHECKING:
+    from CoreWLAN import CWInterface  # NOQA
+
+
+AIRPORT = "/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport"
+GETINFO_TTL = 5
+
+# Keys in the 'airport --getinfo' output, and the 'WirelessSettings' field each one is parsed into; the field
+# names follow the keys used by the '--getinfo --xml' output, where there is one.
+GETINFO_KEYS = {"agrCtlRSSI": "rssi_ctl_agr",
+                "agrExtRSSI": "rssi_ext_agr",
+                "agrCtlNoise": "noise_ctl_agr",
+                "agrExtNoise": "noise_ext_agr",
+                "state": "state",
+                "op mode": "op_mode",
+                "lastTxRate": "last_tx_rate",
+                "maxRate": "max_rate",
+                "lastAssocStatus": "last_assoc_status",
+                "802.11 auth": "auth_80211",
+                "link auth": "link_auth",
+                "BSSID": "bssid",
+                "SSID": "ssid",
+                "MCS": "mcs_index",
+                "guardInterval": "gi",
+                "NSS": "nss",
+                "channel": "channel"}
+GETINFO_INT_KEYS = {"rssi_ctl_agr",
+                    "rssi_ext_agr",
+                    "noise_ctl_agr",
+                    "noise_ext_agr",
+                    "last_tx_rate",
+                    "max_rate",
+                    "last_assoc_status",
+                    "mcs_index",
+                    "gi",
+                    "nss"}
+
+_getinfo_cache = dict()  # "result": (time, WirelessSettings)
+
+# Values of each network in the 'airport --scan --xml' output that are used, the rest (such as the raw IE data)
+# is skipped while parsing
+SCAN_FIELDS = ["AP_MODE", "BSSID", "CHANNEL", "NOISE", "RSSI", "SSID"]
+SCAN_KEYS = {*SCAN_FIELDS, "80211D_IE", "HT_IE"}
+SCAN_BANDS = {True: "2.4GHz", False: "5GHz"}  # channels 1 to 14 are 2.4GHz
+
+
+@dataclass(slots=True)
 class WirelessSettings:
     auth_80211: str = field(default=None)
     auth_lower: int = field(default=None)
@@ -29,16 +71,24 @@ class WirelessSettings:
     channel: int = field(default=None)
     channel_extension: int = field(default=None)
     channel_flags: int = field(default=None)
+    gi: int = field(default=None)
     last_assoc_status: int = field(default=None)
     last_tx_rate: int | float = field(default=None)
     link_auth: int = field(default=None)
     max_rate: int | float = field(default=None)
+    mcs_index: int = field(default=None)
+    noise_ctl_agr: int = field(default=None)
+    noise_ext_agr: int = field(default=None)
+    nss: int = field(default=None)
     op_mode: str = field(default=None)
+    rssi_ctl_agr: int = field(default=None)
+    rssi_ext_agr: int = field(default=None)
     ssid: str = field(default=None)
     state: str = field(default=None)
+    transmit_power: int = field(default=None)
 
 
-@dataclass
+@dataclass(slots=True)
 class WirelessBroadcastNetwork:
     ap_mode: int | str = field(default=None)
     bssid: str = field(default=None)
@@ -51,14 +101,17 @@ class WirelessBroadcastNetwork:
 
     def __post_init__(self):
         self.ap_mode = OPERATING_MODES.get(self.ap_mode, self.ap_mode)
-        self.ssid = self.ssid.decode("utf-8")
+        self.ssid = self.ssid.decode("utf-8") if isinstance(self.ssid, bytes) else self.ssid
 
 
-def _airport(args: List[str], **kwargs) -> subprocess.CompletedProcess:
-    """Wrapper around the 'airport' binary in the 802.11 framework.
+class ScanError(Exception):
+    """The 'airport' scan exited with an error, or its output ended before the end of the document."""
 
-    :param args: list of string arguments to pass on to 'airport'
-    :param **kwargs: dictionary of arguments to pass on to the 'subprocess' call"""
+
+def _airport_cmd(args: List[str]) -> List[str]:
+    """Return the command to run the 'airport' binary with the arguments, exiting if root is required.
+
+    :param args: list of string arguments to pass on to 'airport'"""
     root_args = ["-I", "--info",
                  "-s", "--scan",
                  "-z", "--disassociate"]
@@ -69,10 +122,19 @@ def _airport(args: List[str], **kwargs) -> subprocess.CompletedProcess:
             print(f"Error: root required for these arguments: {root_req_args}", file=sys.stderr)
             sys.exit(1)
 
-    cmd = ["/System/Library/PrivateFrameworks/Apple80211.framework/Versions/Current/Resources/airport"]
+    cmd = [AIRPORT]
     cmd.extend(args)
+    return cmd
+
+
+@profiled("subprocess.airport")
+def _airport(args: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """Wrapper around the 'airport' binary in the 802.11 framework.
+
+    :param args: list of string arguments to pass on to 'airport'
+    :param **kwargs: dictionary of arguments to pass on to the 'subprocess' call"""
     kwargs = kwargs or {"capture_output": True, "encoding": "utf-8"}
-    return subprocess.run(cmd, **kwargs)
+    return subprocess.run(_airport_cmd(args), **kwargs)
 
 
 def disassociate() -> None:
@@ -81,113 +143,226 @@ def disassociate() -> None:
     return _airport(args)
 
 
-def getinfo() -> Optional[WirelessSettings]:
-    """Get current wireless status info. Requires root to get BSSID.
+def getinfo(iface: Optional[CWInterface] = None, max_age: int | float = GETINFO_TTL) -> Optional[WirelessSettings]:
+    """Get current wireless status info, read from the 'CWInterface' object when there is one. The 'airport'
+    binary is only used as a fallback: when there is no interface object, or when the interface is connected
+    but CoreWLAN does not report the BSSID (macOS redacts it without location services access); values read
+    from the interface take precedence. 'airport' has been removed from newer macOS releases, so the fallback
+    is skipped when the binary does not exist.
 
-    Note: The output of "--getinfo" changes if "--xml" is used, with data relating to "BSSID" and other
-          items not included in the xml output, so this function merges data from the '--getinfo' output
-          and the '--getinfo --xml' output into one result
+    :param iface: the 'CWInterface' object to read from
+    :param max_age: number of seconds a previous 'airport' result is considered current"""
+    result = native_getinfo(iface) if iface is not None else None
 
-          This info is a 'mapping' of the '--getinfo' "keys" against the actual key's from the output of
-          '--getinfo --xml':
-          xml_key_map = {"agrCtlRSSI": "RSSI_CTL_AGR",
-                         "agrExtRSSI": "RSSI_EXT_AGR",
-                         "agrCtlNoise": "NOISE_CTL_AGR",
-                         "agrExtNoise": "NOISE_EXT_AGR",  # unsure of actual xml key name
-                         "MCS": "MCS_INDEX",
-                         "guardInterval": "GI",
-                         "NSS": "NSS",
-                         "channel": "CHANNEL"}
+    if (result is None or (result.bssid is None and result.state == "running")) and os.path.exists(AIRPORT):
+        fallback = _airport_getinfo(max_age=max_age)
 
-          The 'channel' value from the '--getinfo' output includes the extension channel info from
-          802.11n standard, for example: '149,1' is '149,+1'"""
-    args = ["--getinfo"]
-    # Include these values from the non-xml output in the xml output, the key is the "key" from
-    # the non-xml output, and the value is the key name to use in the xml output
-    inc_from_std_out = {"state": "STATE",  # not in xml
-                        "op mode": "OP_MODE",  # not in xml
-                        "lastTxRate": "LAST_TX_RATE",  # not in xml
-                        "maxRate": "MAX_RATE",  # not in xml
-                        "lastAssocStatus": "LAST_ASSOC_STATUS",  # not in xml
-                        "802.11 auth": "AUTH_80211",  # not in xml
-                        "link auth": "LINK_AUTH",  # not in xml
-                        "BSSID": "BSSID",  # not in xml
-                        "SSID": "SSID"}  # not in xml
-    int_std_out_vals = ["lastTxRate",
-                        "maxRate",
-                        "lastAssocStatus"]
-    p = _airport(args + ["--xml"], **{"capture_output": True})
+        if result is None or fallback is None:
+            return result or fallback
 
-    if p.returncode == 0:
-        result = plistlib.loads(p.stdout.strip())
-        p = _airport(args)
+        for attr in fields(WirelessSettings):
+            if getattr(result, attr.name) is None:
+                setattr(result, attr.name, getattr(fallback, attr.name))
 
-        if p.returncode == 0:
-            for ln in p.stdout.strip().split("\n"):
-                _ln = ln.split(": ")
+    return result
 
-                if len(_ln) == 2:
-                    key, val = [x.strip() for x in _ln]
-                else:
-                    key, val = _ln[0].strip(), None
 
-                if key in int_std_out_vals:
-                    val = int(val)
+def native_getinfo(iface: CWInterface) -> Optional[WirelessSettings]:
+    """Get current wireless status info from a 'CWInterface' object in one in-process read, without spawning
+    'airport'; the values use the same units and names as the 'airport --getinfo' output.
 
-                # Add channel extension value
-                if key == "channel" and val and "," in val:
-                    result["CHANNEL_EXTENSION"] = int("".join(val.split(",")[1:]))
-                else:
-                    result["CHANNEL_EXTENSION"] = None
+    :param iface: the 'CWInterface' object to read from"""
+    if iface is None:
+        return None
 
-                if key in inc_from_std_out:
-                    result[inc_from_std_out[key]] = val
+    channel = iface.wlanChannel()
+    return WirelessSettings(bssid=o2p(iface.bssid()),
+                            channel=o2p(channel.channelNumber()) if channel else None,
+                            channel_extension=CHANNEL_WIDTH_MHZ.get(o2p(channel.channelWidth())) if channel else None,
+                            last_tx_rate=o2p(iface.transmitRate()),
+                            noise_ctl_agr=o2p(iface.noiseMeasurement()),
+                            op_mode=INTERFACE_MODES_TEXT.get(o2p(iface.interfaceMode())),
+                            rssi_ctl_agr=o2p(iface.rssiValue()),
+                            ssid=o2p(iface.ssid()),
+                            state=INTERFACE_STATES_TEXT.get(o2p(iface.interfaceState())),
+                            transmit_power=o2p(iface.transmitPower()))
 
-        if result:
-            result = {k.lower(): v for k, v in result.items()}  # lower case keys
-            result.update({k: None for k, v in result.items() if v == ""})  # set empty strings to None
-            result = WirelessSettings(**result)
 
-        return result
+def _airport_getinfo(max_age: int | float = GETINFO_TTL) -> Optional[WirelessSettings]:
+    """Get current wireless status info with 'airport --getinfo'. Requires root to get BSSID.
 
+    Note: The output of "--getinfo" includes everything the "--getinfo --xml" output has, and more (such as
+          the BSSID), so only the plain text output is parsed, in one pass. The keys in the output are mapped
+          to the 'WirelessSettings' field names in 'GETINFO_KEYS'.
 
-def scan(ssid: Optional[str] = None) -> Optional[List[WirelessBroadcastNetwork]]:
-    """Perform a wireless broadcast scan.
+          The 'channel' value from the '--getinfo' output includes the extension channel info from
+          802.11n standard, for example: '149,1' is '149,+1'
 
-    :param ssid: provide the SSID of the network to scan for specifically"""
-    if ssid:
-        args = [f"--scan={ssid}", "--xml"]
-    else:
-        args = ["--scan", "--xml"]
-
-    p = _airport(args, **{"capture_output": True})
-    fieldnames = ["AP_MODE",
-                  "BSSID",
-                  "CHANNEL",
-                  "NOISE",
-                  "RSSI",
-                  "SSID"]
+          The result is re-used for 'max_age' seconds, as this is the fallback for every BSSID read.
+
+    :param max_age: number of seconds a previous result is considered current, use 0 to always run 'airport'"""
+    cached = _getinfo_cache.get("result")
+
+    if cached and (monotonic() - cached[0]) <= max_age:
+        return cached[1]
+
+    p = _airport(["--getinfo"])
+    result = None
 
     if p.returncode == 0:
-        result = list()
-        data = plistlib.loads(p.stdout.strip())
+        values = dict()
 
-        for network in data:
-            attrs = dict()
-            IE_80211D = network.get("80211D_IE")
-            HT_IE = network.get("HT_IE")
+        for ln in p.stdout.splitlines():
+            key, _, val = ln.partition(":")
+            attr = GETINFO_KEYS.get(key.strip())
 
-            if IE_80211D:
-                attrs["country_code"] = IE_80211D.get("IE_KEY_80211D_COUNTRY_CODE", None)
+            if not attr:
+                continue
+
+            val = val.strip() or None
+
+            if attr == "channel" and val:
+                channel, _, extension = val.partition(",")
+                values["channel"] = int(channel)
+                values["channel_extension"] = int(extension) if extension else None
+            elif attr in GETINFO_INT_KEYS and val:
+                values[attr] = int(val)
             else:
-                attrs["country_code"] = None
+                values[attr] = val
+
+        if values:
+            result = WirelessSettings(**values)
 
-            if HT_IE:
-                attrs["second_channel_offset"] = HT_IE.get("HT_SECONDARY_CHAN_OFFSET", None)
+    _getinfo_cache["result"] = (monotonic(), result)
+    return result
 
-            for attr in fieldnames:
-                attrs[attr.lower()] = network.get(attr)
 
-            result.append(WirelessBroadcastNetwork(**attrs))
+def _plist_value(elem: ElementTree.Element) -> Any:
+    """Convert one element of a property list (XML) to native Python data types.
 
-        return result
+    :param elem: the element to convert"""
+    tag = elem.tag
+
+    if tag == "dict":
+        return _plist_dict(elem)
+    elif tag == "array":
+        return [_plist_value(child) for child in elem]
+    elif tag in ["true", "false"]:
+        return tag == "true"
+    elif tag == "integer":
+        return int(elem.text)
+    elif tag == "real":
+        return float(elem.text)
+    elif tag == "data":
+        return base64.b64decode(elem.text or "")
+
+    return elem.text or ""
+
+
+def _plist_dict(elem: ElementTree.Element, keys: Optional[Container[str]] = None) -> Dict[str, Any]:
+    """Convert a property list (XML) 'dict' element to a dictionary.
+
+    :param elem: the 'dict' element to convert
+    :param keys: optional keys to convert, other values (such as the raw IE data) are skipped"""
+    children = list(elem)
+    return {key.text: _plist_value(value) for key, value in zip(children[::2], children[1::2])
+            if keys is None or key.text in keys}
+
+
+def _broadcast_network(network: Dict[str, Any]) -> WirelessBroadcastNetwork:
+    """Build a WirelessBroadcastNetwork from one network of the 'airport --scan --xml' output.
+
+    :param network: dictionary of one network from the scan output"""
+    attrs = {attr.lower(): network.get(attr) for attr in SCAN_FIELDS}
+    IE_80211D = network.get("80211D_IE")
+    HT_IE = network.get("HT_IE")
+    attrs["country_code"] = IE_80211D.get("IE_KEY_80211D_COUNTRY_CODE", None) if IE_80211D else None
+
+    if HT_IE:
+        attrs["second_channel_offset"] = HT_IE.get("HT_SECONDARY_CHAN_OFFSET", None)
+
+    return WirelessBroadcastNetwork(**attrs)
+
+
+def iter_scan(ssid: Optional[str] = None,
+              min_rssi: Optional[int] = None,
+              band: Optional[str] = None,
+              limit: Optional[int] = None) -> Iterator[WirelessBroadcastNetwork]:
+    """Perform a wireless broadcast scan, yielding networks as they are parsed from the 'airport' output.
+
+    The scan output is parsed incrementally from the pipe, so each network is yielded without waiting for (or
+    holding) the rest of the output, and only the values used by 'WirelessBroadcastNetwork' are converted.
+    Networks are filtered before they are built; once 'limit' networks have been yielded, or the caller stops
+    iterating, 'airport' is stopped without reading the rest of its output. If the scan fails, or its output
+    is cut short, 'ScanError' is raised after the networks that were parsed have been yielded.
+
+    :param ssid: provide the SSID of the network to scan for specifically, only exact matches are yielded
+    :param min_rssi: optional minimum RSSI (in dBm) of the networks to yield, for example: -70
+    :param band: optional channel band of the networks to yield, '2.4GHz' or '5GHz' (in any case)
+    :param limit: optional maximum number of networks to yield"""
+    args = [f"--scan={ssid}", "--xml"] if ssid else ["--scan", "--xml"]
+    raw_ssid = ssid.encode("utf-8") if ssid else None
+    band = channel_band(band) if band else None
+    start = perf_counter()
+    p = subprocess.Popen(_airport_cmd(args), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    count, depth, networks = 0, 0, None
+    completed, parse_error = False, None
+
+    try:
+        # The output is a 'plist' element (depth 1), of an 'array' (depth 2), of one 'dict' per network
+        for event, elem in ElementTree.iterparse(p.stdout, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                networks = elem if depth == 2 else networks
+                continue
+
+            depth -= 1
+
+            if not (depth == 2 and elem.tag == "dict"):
+                continue
+
+            network = _plist_dict(elem, keys=SCAN_KEYS)
+            networks.clear()  # nothing is kept of the networks already parsed
+
+            if raw_ssid and not network.get("SSID") == raw_ssid:
+                continue
+
+            if min_rssi is not None and (network.get("RSSI") is None or network["RSSI"] < min_rssi):
+                continue
+
+            if band and not SCAN_BANDS.get(network.get("CHANNEL", 0) <= 14) == band:
+                continue
+
+            yield _broadcast_network(network)
+            count += 1
+
+            if limit and count >= limit:
+                break
+        else:
+            completed = True
+    except ElementTree.ParseError as e:
+        parse_error = e  # no (or incomplete) output, for example when the scan failed
+    finally:
+        p.stdout.close()
+
+        if p.poll() is None:
+            p.kill()
+
+        p.wait()
+        record("subprocess.airport", perf_counter() - start)
+
+    # Stopping at 'limit' kills 'airport', so only a scan that was read to the end has a return code to check
+    if parse_error is not None or (completed and not p.returncode == 0):
+        raise ScanError(f"'airport' exited with {p.returncode}" + (f", {parse_error}" if parse_error else ""))
+
+
+def scan(ssid: Optional[str] = None) -> Optional[List[WirelessBroadcastNetwork]]:
+    """Perform a wireless broadcast scan, returning all networks found, or None if the scan failed; see
+    'iter_scan()' to filter, or stop early, without building the full list.
+
+    :param ssid: provide the SSID of the network to scan for specifically"""
+    try:
+        return list(iter_scan(ssid=ssid))
+    except ScanError as e:
+        print(f"Error scanning for networks: {e}", file=sys.stderr)
+        return None
@@ -3,6 +3,11 @@ import subprocess
 from dataclasses import dataclass, field
 from typing import List, Optional
 
+from .profiling import profiled
+
+
+NETWORKSETUP = "/usr/sbin/networksetup"
+
 
 @dataclass
 class NetworkSetupOutput:
@@ -28,12 +33,45 @@ class NetworkSetupOutput:
                 self.stdout = None
 
 
-def _networksetup(args: List[str], **kwargs) -> subprocess.CompletedProcess:
+@dataclass
+class NetworkSetupInvocation:
+    """A single '/usr/sbin/networksetup' invocation; the 'success_str' is the string value that the last
+    line of standard output starts with when the invocation succeeds."""
+    args: List[str] = field(default=None)
+    success_str: str = field(default=None)
+
+
+class NetworkSetupExecutor:
+    """Run '/usr/sbin/networksetup' invocations and gather the results into 'NetworkSetupOutput' objects.
+    Invocations run one at a time, in the order they are given: every invocation that changes the preferred
+    network list of an interface rewrites the whole list, so they are never independent of each other."""
+    def __init__(self, binary: Optional[str] = None) -> None:
+        """Initialise.
+
+        :param binary: path to the 'networksetup' binary, for example a stand-in script for testing;
+                       defaults to 'NETWORKSETUP'"""
+        self.binary = binary
+
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    def run(self, invocation: NetworkSetupInvocation) -> NetworkSetupOutput:
+        """Run one invocation and wait for the result.
+
+        :param invocation: the invocation to run"""
+        p = _networksetup(args=invocation.args, binary=self.binary)
+        return _parse_completed_process(p=p, success_str=invocation.success_str)
+
+
+@profiled("subprocess.networksetup")
+def _networksetup(args: List[str], binary: Optional[str] = None, **kwargs) -> subprocess.CompletedProcess:
     """Run the '/usr/sbin/networksetup' command with arguments.
 
     :param args: a list of strings to include in the 'networksetup' argument list
+    :param binary: path to the 'networksetup' binary, defaults to 'NETWORKSETUP'
     :param **kwargs: **kwargs to pass on to 'subprocess'"""
-    cmd = ["/usr/sbin/networksetup"] + args
+    cmd = [binary or NETWORKSETUP] + args
     kwargs = kwargs or {"capture_output": True, "encoding": "utf-8"}
     return subprocess.run(cmd, **kwargs)
 
@@ -44,11 +82,11 @@ def _parse_completed_process(p: subprocess.CompletedProcess, success_str: str) -
     :param p: the completed subprocess object
     :param success_str: the string value that indicates the subprocess completed successfully"""
     returncode = p.returncode
-    stdout = p.stdout.strip() if not p.stdout == "" else None
-    stderr = p.stderr.strip() if not p.stderr == "" else None
+    stdout = p.stdout.strip() if p.stdout else None
+    stderr = p.stderr.strip() if p.stderr else None
 
     if p.returncode == 0:
-        if stdout.splitlines()[-1].startswith(success_str):
+        if stdout and stdout.splitlines()[-1].startswith(success_str):
             return NetworkSetupOutput(returncode=returncode, stdout=stdout, stderr=stderr)
         else:
             return NetworkSetupOutput(returncode=1, stdout=None, stderr=stdout or stderr)
@@ -74,13 +112,25 @@ def add_ssids(iface: str,
                      is not recommended to use this as a means of configuring the SSID, use other
                      methods instead, also note, no username can be provided for SSIDs that require
                      a username and password credential to be provided"""
+    invocation = add_ssids_invocation(iface=iface, ssid=ssid, index=index, security_type=security_type,
+                                      password=password)
+    return _parse_completed_process(p=_networksetup(args=invocation.args), success_str=invocation.success_str)
+
+
+def add_ssids_invocation(iface: str,
+                         ssid: str,
+                         index: int | str,
+                         security_type: str,
+                         password: Optional[str] = None) -> NetworkSetupInvocation:
+    """Build the '/usr/sbin/networksetup' invocation used by 'add_ssids' for use with 'NetworkSetupExecutor';
+    the parameters are the same as 'add_ssids'."""
     cmd = ["-addpreferredwirelessnetworkatindex", iface, ssid, str(index), security_type]
 
     # Only append if password is there
     if password:
         cmd.append(password)
 
-    return _parse_completed_process(p=_networksetup(args=cmd), success_str=f"Added {ssid}")
+    return NetworkSetupInvocation(args=cmd, success_str=f"Added {ssid}")
 
 
 def remove_ssids(iface: str, ssid: Optional[str] = None) -> NetworkSetupOutput:
@@ -91,9 +141,16 @@ def remove_ssids(iface: str, ssid: Optional[str] = None) -> NetworkSetupOutput:
     :param iface: wireless interface to remove the preferred network from, for example: 'en1'
     :param ssid: the optional SSID name (string) to remove, for example: 'Pismo'; if no SSID is
                  provided, then all existing preferred wireless networks are removed"""
+    invocation = remove_ssids_invocation(iface=iface, ssid=ssid)
+    return _parse_completed_process(p=_networksetup(args=invocation.args), success_str=invocation.success_str)
+
+
+def remove_ssids_invocation(iface: str, ssid: Optional[str] = None) -> NetworkSetupInvocation:
+    """Build the '/usr/sbin/networksetup' invocation used by 'remove_ssids' for use with
+    'NetworkSetupExecutor'; the parameters are the same as 'remove_ssids'."""
     if ssid:
         cmd = ["-removepreferredwirelessnetwork", iface, ssid]
     else:
         cmd = ["-removeallpreferredwirelessnetworks", iface]
     # When removing all the stdout msg doesn't include the SSID name, so use generic success string value
-    return _parse_completed_process(p=_networksetup(args=cmd), success_str="Removed ")
+    return NetworkSetupInvocation(args=cmd, success_str="Removed ")
@@ -0,0 +1,189 @@
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+BANDS = ["2.4GHz", "5GHz"]
+
+
+def channel_band(value: str) -> str:
+    """Return the channel band name for a band given in any case, for example: '2.4ghz' is '2.4GHz'; earlier
+    releases spelt it '2.4Ghz', which is accepted as well. Raises ValueError for an unknown band.
+
+    :param value: the channel band"""
+    for band in BANDS:
+        if band.lower() == str(value).lower():
+            return band
+
+    raise ValueError(f"unknown channel band {value!r}, valid bands are: {', '.join(BANDS)}")
+
+
+def ssid_positions(ssids: List[str]) -> Dict[str, List[int]]:
+    """Map each SSID to every position it occupies in the list of SSIDs. The same SSID name can be saved
+    more than once (for example with a different security type), so each SSID maps to a list of positions
+    in ascending order.
+
+    :param ssids: list of SSID names (as strings) in their current order"""
+    result = dict()
+
+    for index, ssid in enumerate(ssids):
+        result.setdefault(ssid, []).append(index)
+
+    return result
+
+
+def reorder_positions(ssids: List[str],
+                      new_order: List[str],
+                      positions: Dict[str, List[int]] = None) -> Tuple[List[int], List[str]]:
+    """Compute the new order of SSIDs as a list of positions into the current list of SSIDs.
+
+    SSIDs in 'new_order' are placed first, in the order given, followed by all other SSIDs in their current
+    order. When an SSID is saved more than once, every profile with that name is moved, keeping the
+    current relative order of those profiles. SSIDs repeated in 'new_order' are only placed once.
+
+    Returns a tuple of the list of positions and the list of SSIDs in 'new_order' that are not in 'ssids';
+    when any SSIDs are missing, the list of positions is empty.
+
+    :param ssids: list of SSID names (as strings) in their current order
+    :param new_order: list of SSID names (as strings) in the order they will be organised into
+    :param positions: optional pre-computed result of 'ssid_positions(ssids)'"""
+    positions = positions if positions is not None else ssid_positions(ssids)
+    missing = list(dict.fromkeys(ssid for ssid in new_order if ssid not in positions))
+
+    if missing:
+        return ([], missing)
+
+    result = list()
+    placed = set()
+
+    for ssid in new_order:
+        if ssid not in placed:
+            placed.add(ssid)
+            result.extend(positions[ssid])
+
+    result.extend(index for index, ssid in enumerate(ssids) if ssid not in placed)
+    return (result, missing)
+
+
+def longest_increasing_subsequence(values: List[int]) -> List[int]:
+    """Return the indexes (into 'values') of one longest strictly increasing subsequence of 'values'.
+    This is the patience sorting method, and is O(n log n).
+
+    :param values: list of integers"""
+    tails = list()  # tails[n] is the index of the smallest tail value of an increasing run of length n + 1
+    tail_values = list()
+    previous = [-1] * len(values)
+
+    for index, value in enumerate(values):
+        run = bisect_left(tail_values, value)
+
+        if run > 0:
+            previous[index] = tails[run - 1]
+
+        if run == len(tails):
+            tails.append(index)
+            tail_values.append(value)
+        else:
+            tails[run] = index
+            tail_values[run] = value
+
+    result = list()
+    index = tails[-1] if tails else -1
+
+    while index != -1:
+        result.append(index)
+        index = previous[index]
+
+    result.reverse()
+    return result
+
+
+def minimal_moves(current: List[str], target: List[str]) -> Tuple[List[str], List[Tuple[int, str]]]:
+    """Compute the smallest set of remove and insert operations that turns the 'current' order of SSIDs
+    into the 'target' order of SSIDs.
+
+    The SSIDs that keep their relative order are the longest increasing subsequence of their current
+    positions taken in target order; every other SSID is removed and then re-inserted. Removals are
+    returned first; inserts are returned in ascending index order, and must be applied in that order
+    after all removals so each index is correct at the time of the insert. SSIDs only in 'target' are
+    inserted, and SSIDs only in 'current' are removed. Both lists are expected to be free of duplicates.
+
+    :param current: list of SSID names (as strings) in their current order
+    :param target: list of SSID names (as strings) in their new order"""
+    current_positions = {ssid: index for index, ssid in enumerate(current)}
+    common = [ssid for ssid in target if ssid in current_positions]
+    keep = {common[index]
+            for index in longest_increasing_subsequence([current_positions[ssid] for ssid in common])}
+    removals = [ssid for ssid in current if ssid not in keep]
+    inserts = [(index, ssid) for index, ssid in enumerate(target) if ssid not in keep]
+    return (removals, inserts)
+
+
+def saved_insert_indexes(saved: List[str],
+                         removals: List[str],
+                         inserts: List[Tuple[int, str]]) -> List[Tuple[int, str]]:
+    """Translate the insert indexes of 'minimal_moves()', which count each SSID once, into indexes into the list
+    of saved SSIDs, where the same SSID can be saved more than once; each SSID is inserted just before the first
+    profile of the SSID that follows it. Without duplicates, the indexes are the same.
+
+    :param saved: list of SSID names (as strings) of every saved network profile, in their current order
+    :param removals: the SSIDs removed by 'minimal_moves()', every profile with the SSID name is removed
+    :param inserts: the inserts of 'minimal_moves()'"""
+    removed = set(removals)
+    ssids = [ssid for ssid in saved if ssid not in removed]
+
+    if len(ssids) == len(set(ssids)):
+        return inserts
+
+    result = list()
+
+    for index, ssid in inserts:
+        seen = set()
+        position = len(ssids)
+
+        for n, name in enumerate(ssids):
+            if name not in seen:
+                if len(seen) == index:
+                    position = n
+                    break
+
+                seen.add(name)
+
+        ssids.insert(position, ssid)
+        result.append((position, ssid))
+
+    return result
+
+
+def rank_by_signal(ssids: List[str],
+                   networks: Iterable[Any],
+                   band_bonus: Optional[Dict[str, int | float]] = None,
+                   width_bonus: Optional[Dict[str, int | float]] = None) -> List[str]:
+    """Rank SSIDs by the signal of the networks found in a scan, in one pass over the scan results.
+
+    The score of a network is its RSSI plus the bonus for its channel band and channel width; the score of an
+    SSID is the best score of all networks (BSSIDs) with that SSID. SSIDs found in the scan are ranked by
+    score (highest first, ties keep their current order), followed by the SSIDs not found in their current
+    order. Each SSID is returned once.
+
+    :param ssids: list of SSID names (as strings) in their current order
+    :param networks: scanned networks, objects with 'ssid', 'rssi', 'channel_band' and 'channel_width'
+                     attributes, for example 'WirelessNetwork' objects
+    :param band_bonus: score added for each channel band (in any case), for example: {'5GHz': 10}
+    :param width_bonus: score added for each channel width, for example: {'80MHz': 2}"""
+    bands = {band.lower(): band for band in BANDS}
+    band_bonus = {bands.get(str(band).lower(), band): bonus for band, bonus in (band_bonus or dict()).items()}
+    width_bonus = width_bonus or dict()
+    saved = set(ssids)
+    scores = dict()
+
+    for network in networks:
+        if network.ssid in saved and network.rssi is not None:
+            score = (network.rssi
+                     + band_bonus.get(network.channel_band, 0)
+                     + width_bonus.get(network.channel_width, 0))
+
+            if score > scores.get(network.ssid, float("-inf")):
+                scores[network.ssid] = score
+
+    ordered = list(dict.fromkeys(ssids))
+    found = sorted([ssid for ssid in ordered if ssid in scores], key=lambda ssid: scores[ssid], reverse=True)
+    return found + [ssid for ssid in ordered if ssid not in scores]
@@ -0,0 +1,58 @@
+import json
+import plistlib
+import sys
+
+from typing import Any, Dict, List, Optional, TextIO
+
+FORMATS = ["text", "json", "plist", "ndjson"]
+
+
+def _plist_safe(value: Any) -> Any:
+    """Return a copy of a value that can be written as a property list, which has no 'None' value; keys with a
+    'None' value are left out of dictionaries, and 'None' items in lists are written as empty strings.
+
+    :param value: the value to convert"""
+    if isinstance(value, dict):
+        return {str(k): _plist_safe(v) for k, v in value.items() if v is not None}
+    elif isinstance(value, (list, tuple)):
+        return [_plist_safe(v) if v is not None else "" for v in value]
+
+    return value
+
+
+def serialize(document: Dict[str, Any], fmt: str, rows: Optional[List[Dict[str, Any]]] = None) -> bytes:
+    """Serialize a document in one of the machine readable formats.
+
+    :param document: the document to serialize
+    :param fmt: 'json', 'plist', or 'ndjson'
+    :param rows: for 'ndjson', the records to write one per line, defaults to the document as one line"""
+    if fmt == "json":
+        return json.dumps(document, indent=2, ensure_ascii=False, default=str).encode("utf-8") + b"\n"
+    elif fmt == "plist":
+        return plistlib.dumps(_plist_safe(document))
+    elif fmt == "ndjson":
+        rows = [document] if rows is None else rows
+        lines = [json.dumps(row, separators=(",", ":"), ensure_ascii=False, default=str) for row in rows]
+        return "".join(f"{line}\n" for line in lines).encode("utf-8")
+
+    raise ValueError(f"Unknown format {fmt!r}, valid formats are: {', '.join(FORMATS[1:])}")
+
+
+def write(document: Dict[str, Any],
+          fmt: str,
+          rows: Optional[List[Dict[str, Any]]] = None,
+          output: TextIO = sys.stdout) -> None:
+    """Serialize a document and write it with one write call.
+
+    :param document: the document to serialize
+    :param fmt: 'json', 'plist', or 'ndjson'
+    :param rows: for 'ndjson', the records to write one per line, defaults to the document as one line
+    :param output: file object to write to"""
+    data = serialize(document, fmt, rows=rows)
+    output.flush()
+
+    if hasattr(output, "buffer"):
+        output.buffer.write(data)
+        output.buffer.flush()
+    else:
+        output.write(data.decode("utf-8"))
@@ -0,0 +1,192 @@
+"""Opt-in timing of backend calls, 'o2p' conversions, and subprocesses.
+
+Profiling is enabled with 'enable()' (the '--profile' argument), or by setting the 'SSIDSHUFFLE_PROFILE'
+environment variable to '1' (summary written to stderr) or to the path of a file to write the summary to;
+'0', 'false', 'no', 'off', or an empty value leave profiling off.
+When profiling is not enabled, each instrumented call costs one global lookup."""
+import atexit
+import functools
+import json
+import math
+import os
+import sys
+import threading
+
+from collections import deque
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, Optional, Set
+
+PROFILE_ENV = "SSIDSHUFFLE_PROFILE"
+PROFILE_SAMPLES = 10000  # samples kept per call site for the p95, counts and totals cover every call
+DISABLED = ["", "0", "false", "no", "off"]
+STDERR = ["1", "-", "stderr"]
+SUBPROCESS_PREFIX = "subprocess."
+
+_profiler = None
+
+
+class Profiler:
+    """Counts and times calls per call site, for example 'CWInterface.configuration' or 'subprocess.airport'."""
+    def __init__(self) -> None:
+        self.started = monotonic()
+        self.counts = dict()
+        self.totals = dict()
+        self.samples = dict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"{type(self).__name__}(sites={len(self.counts)})"
+
+    def record(self, site: str, elapsed: float) -> None:
+        """Record one call.
+
+        :param site: the call site name
+        :param elapsed: the duration of the call in seconds"""
+        with self._lock:
+            if site not in self.counts:
+                self.counts[site], self.totals[site] = 0, 0.0
+                self.samples[site] = deque(maxlen=PROFILE_SAMPLES)
+
+            self.counts[site] += 1
+            self.totals[site] += elapsed
+            self.samples[site].append(elapsed)
+
+    def summary(self) -> Dict[str, Any]:
+        """Return the call count, total and p95 duration (in seconds) per call site, and the subprocess count
+        per command."""
+        with self._lock:
+            calls = dict()
+
+            for site in sorted(self.counts):
+                samples = sorted(self.samples[site])
+                calls[site] = {"count": self.counts[site],
+                               "total": self.totals[site],
+                               "p95": samples[max(math.ceil(len(samples) * 0.95) - 1, 0)]}
+
+        subprocesses = {site[len(SUBPROCESS_PREFIX):]: call["count"] for site, call in calls.items()
+                        if site.startswith(SUBPROCESS_PREFIX)}
+
+        return {"pid": os.getpid(),
+                "elapsed": monotonic() - self.started,
+                "calls": calls,
+                "subprocesses": {"count": sum(subprocesses.values()), "commands": subprocesses}}
+
+    def write(self, destination: str = "-") -> None:
+        """Write the summary as one line of JSON.
+
+        :param destination: path of the file to write to, or '-' for stderr"""
+        summary = json.dumps(self.summary(), separators=(",", ":"))
+
+        if destination in STDERR:
+            print(summary, file=sys.stderr)
+        else:
+            try:
+                with open(destination, "w") as f:
+                    f.write(f"{summary}\n")
+            except OSError as e:
+                print(f"Error writing profile summary to {destination!r}: {e}", file=sys.stderr)
+
+
+def enable(destination: str = "-") -> Profiler:
+    """Enable profiling; the summary is written to 'destination' when the process exits.
+
+    :param destination: path of the file to write the summary to, or '-' for stderr"""
+    global _profiler
+
+    if _profiler is None:
+        _profiler = Profiler()
+        atexit.register(_profiler.write, destination)
+
+    return _profiler
+
+
+def profiler() -> Optional[Profiler]:
+    """Return the profiler, or None if profiling is not enabled."""
+    return _profiler
+
+
+def record(site: str, elapsed: float) -> None:
+    """Record one call if profiling is enabled.
+
+    :param site: the call site name
+    :param elapsed: the duration of the call in seconds"""
+    if _profiler is not None:
+        _profiler.record(site, elapsed)
+
+
+def profiled(site: str) -> Callable:
+    """Decorator that records each call of the decorated function under 'site' when profiling is enabled.
+
+    :param site: the call site name"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _profiler is None:
+                return func(*args, **kwargs)
+
+            start = perf_counter()
+
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _profiler.record(site, perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+class ProfiledObject:
+    """Proxy that records every method call made on an object, for example a 'CWInterface'. Objects returned
+    by the methods named in 'children' are proxied as well; anything else is returned as is, so objects that
+    are passed back to PyObjC are never proxies."""
+    __slots__ = ("_obj", "_name", "_children", "_sequences")
+
+    def __init__(self,
+                 obj: Any,
+                 name: str,
+                 children: Optional[Dict[str, str]] = None,
+                 sequences: Optional[Set[str]] = None) -> None:
+        """Initialise.
+
+        :param obj: the object to proxy
+        :param name: the name used as the prefix of the call site names, for example: 'CWInterface'
+        :param children: mapping of method names to the name used for the objects they return
+        :param sequences: names of the 'children' methods that return a sequence of objects to proxy"""
+        self._obj = obj
+        self._name = name
+        self._children = children or dict()
+        self._sequences = sequences or set()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self._obj!r})"
+
+    def __getattr__(self, attr: str) -> Any:
+        value = getattr(self._obj, attr)
+
+        if not callable(value):
+            return value
+
+        site, child = f"{self._name}.{attr}", self._children.get(attr)
+
+        def call(*args, **kwargs):
+            start = perf_counter()
+
+            try:
+                result = value(*args, **kwargs)
+            finally:
+                record(site, perf_counter() - start)
+
+            if child and result is not None:
+                if attr in self._sequences:
+                    return [ProfiledObject(obj, child) for obj in result]
+
+                return ProfiledObject(result, child)
+
+            return result
+
+        return call
+
+
+if os.environ.get(PROFILE_ENV, "").strip().lower() not in DISABLED:
+    enable(os.environ[PROFILE_ENV])
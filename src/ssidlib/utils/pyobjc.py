@@ -1,6 +1,28 @@
-from typing import Any, Callable, Optional
+from time import perf_counter
+from typing import Any, Callable, Iterable, List, Optional
 
-from PyObjCTools import Conversion
+from . import profiling
+
+# Values that are already 'native' Python data types (as returned by the fake backend) are returned as is.
+NATIVE_TYPES = {bool, bytes, dict, float, int, list, str, tuple, type(None)}
+
+# PyObjC proxies for NSString ('objc.pyobjc_unicode') and NSNumber ('objc._pythonify.OC_PythonInt' and
+# 'OC_PythonFloat') are subclasses of these types, so they are converted with a cast rather than the
+# property list conversion; the types seen are remembered so each value only needs one dictionary lookup.
+SCALAR_CASTS = {}
+SCALAR_TYPES = (str, int, float)
+
+
+def _scalar_cast(obj_type: type) -> Optional[Callable]:
+    """Return the cast that converts instances of a PyObjC scalar proxy type, or None for other types.
+
+    :param obj_type: the type to look up"""
+    try:
+        return SCALAR_CASTS[obj_type]
+    except KeyError:
+        cast = next((native for native in SCALAR_TYPES if issubclass(obj_type, native)), None)
+        SCALAR_CASTS[obj_type] = cast
+        return cast
 
 
 def o2p(obj: Any, helper: Optional[Callable] = None) -> Any:
@@ -12,4 +34,47 @@ def o2p(obj: Any, helper: Optional[Callable] = None) -> Any:
 
     :param obj: NS* object to convert
     :param helper: conversion helper function to pass to the conversion call if the PyObjC conversion fails"""
-    return Conversion.pythonCollectionFromPropertyList(obj, conversionHelper=helper)
+    obj_type = type(obj)
+
+    if obj_type in NATIVE_TYPES:
+        return obj
+
+    cast = _scalar_cast(obj_type)
+
+    if cast:
+        return cast(obj)
+
+    from PyObjCTools import Conversion
+
+    if profiling.profiler() is None:
+        return Conversion.pythonCollectionFromPropertyList(obj, conversionHelper=helper)
+
+    start = perf_counter()
+
+    try:
+        return Conversion.pythonCollectionFromPropertyList(obj, conversionHelper=helper)
+    finally:
+        profiling.record("o2p.property_list", perf_counter() - start)
+
+
+@profiling.profiled("o2p_many")
+def o2p_many(objs: Iterable[Any], helper: Optional[Callable] = None) -> List[Any]:
+    """Converts each object of an iterable (for example an NSArray, or the SSIDs of a list of network profiles)
+    to 'native' Python data types in one pass; scalars are converted without the property list conversion.
+
+    :param objs: iterable of NS* objects to convert
+    :param helper: conversion helper function to pass to the conversion call if the PyObjC conversion fails"""
+    result = list()
+    append = result.append
+
+    for obj in objs:
+        obj_type = type(obj)
+
+        if obj_type in NATIVE_TYPES:
+            append(obj)
+        elif (cast := _scalar_cast(obj_type)):
+            append(cast(obj))
+        else:
+            append(o2p(obj, helper=helper))
+
+    return result
@@ -0,0 +1,59 @@
+from dataclasses import dataclass, field
+from time import monotonic, sleep
+from typing import Callable, Dict, Iterator, Optional
+
+
+@dataclass
+class PowerCycleResult:
+    """The outcome of 'WLan.power_cycle()': the number of seconds each phase took, in the order the phases
+    ran ('power_off', 'power_on', 'associated', 'addresses'), and the first phase that did not complete
+    before the deadline, if any. Phases that do not apply (for example 'associated' when the interface was
+    not associated before the power cycle) are left out."""
+    phases: Dict[str, float] = field(default_factory=dict)
+    timed_out: Optional[str] = field(default=None)
+    total: float = field(default=None)
+
+    @property
+    def ready(self) -> bool:
+        """Return True if every phase completed before the deadline."""
+        return self.timed_out is None
+
+
+def backoff(deadline: float, interval: int | float = 0.05, max_interval: int | float = 1) -> Iterator[float]:
+    """Yield the number of seconds to wait before each retry, doubling from 'interval' up to 'max_interval',
+    until the deadline has passed; the last wait is cut short at the deadline.
+
+    :param deadline: the 'time.monotonic()' time to stop at
+    :param interval: number of seconds to wait before the first retry
+    :param max_interval: maximum number of seconds to wait between retries"""
+    while True:
+        remaining = deadline - monotonic()
+
+        if remaining <= 0:
+            return
+
+        yield min(interval, remaining)
+        interval = min(interval * 2, max_interval)
+
+
+def wait_until(ready: Callable[[], bool],
+               deadline: float,
+               interval: int | float = 0.05,
+               max_interval: int | float = 1) -> bool:
+    """Call 'ready' until it returns True or the deadline passes, waiting with an exponential backoff between
+    calls; returns True if it returned True before the deadline.
+
+    :param ready: callable returning True when the condition being waited for is met
+    :param deadline: the 'time.monotonic()' time to stop at
+    :param interval: number of seconds to wait before the second call
+    :param max_interval: maximum number of seconds to wait between calls"""
+    if ready():
+        return True
+
+    for delay in backoff(deadline, interval=interval, max_interval=max_interval):
+        sleep(delay)
+
+        if ready():
+            return True
+
+    return False
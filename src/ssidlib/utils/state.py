@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+STATE_ENV = "SSIDSHUFFLE_STATE"
+STATE_FILE = Path.home() / "Library" / "Caches" / "ssidshuffle" / "state.json"
+SYSTEM_STATE_FILE = Path("/Library/Caches/ssidshuffle/state.json")  # used when run as root, for example with 'sudo'
+STATE_FILE_MODE = 0o644
+
+
+def fingerprint(value: Any) -> str:
+    """Return a stable fingerprint (SHA-256 hex digest) of a JSON serializable value.
+
+    :param value: the value to fingerprint, for example a list of (SSID, security type) tuples"""
+    data = json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class AppliedState:
+    """Records, per interface, the policy that was last applied and the fingerprint of the network profiles
+    that resulted from it, so a later run can tell the policy is still applied without reordering anything.
+    The state is stored as JSON in 'STATE_FILE' ('SYSTEM_STATE_FILE' when run as root, as 'sudo' can keep the
+    home directory of the invoking user, who could then not replace the root owned file), or the path in the
+    'SSIDSHUFFLE_STATE' environment variable."""
+    def __init__(self, path: Optional[str | Path] = None) -> None:
+        """Initialise.
+
+        :param path: optional path of the state file"""
+        default = SYSTEM_STATE_FILE if os.geteuid() == 0 else STATE_FILE
+        self.path = Path(path or os.environ.get(STATE_ENV) or default)
+        self._state = None
+
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    @property
+    def state(self) -> Dict[str, Dict[str, str]]:
+        """Return the state, read from the state file on first access; a missing or unreadable state file is
+        treated as an empty state."""
+        if self._state is None:
+            try:
+                with open(self.path) as f:
+                    self._state = json.load(f)
+            except (OSError, ValueError):
+                self._state = dict()
+
+        return self._state
+
+    def is_applied(self, iface: str, policy: str, profiles: str) -> bool:
+        """Return True if the policy was the last policy applied to the interface, and the network profiles
+        have not changed since.
+
+        :param iface: the interface name
+        :param policy: fingerprint of the policy, for example of the list of SSIDs to reorder
+        :param profiles: fingerprint of the current network profiles"""
+        return self.state.get(iface) == {"policy": policy, "profiles": profiles}
+
+    def record(self, iface: str, policy: str, profiles: str) -> None:
+        """Record the policy applied to the interface and the resulting network profiles, and write the state
+        file; failing to write the state file is not an error, the next run just does the full check.
+
+        :param iface: the interface name
+        :param policy: fingerprint of the policy, for example of the list of SSIDs to reorder
+        :param profiles: fingerprint of the network profiles after the policy was applied"""
+        self.state[iface] = {"policy": policy, "profiles": profiles}
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}")
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+
+            with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, STATE_FILE_MODE), "w") as f:
+                json.dump(self.state, f)
+
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
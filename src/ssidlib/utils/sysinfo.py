@@ -1,6 +1,15 @@
+import plistlib
 import subprocess
 
 from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Optional
+
+from .profiling import profiled
+
+
+SW_VERS = "/usr/bin/sw_vers"
+SYSTEM_VERSION = "/System/Library/CoreServices/SystemVersion.plist"
 
 
 @dataclass
@@ -14,13 +23,48 @@ class OSVersion:
     rsr_version: int | str = field(default=None)
 
 
+def _os_version(vers: dict) -> OSVersion:
+    """Split the version string into the major/minor/patch values and return an OSVersion object.
+
+    :param vers: dictionary of OSVersion attributes, with at least the 'version' attribute"""
+    sv = vers["version"].split(".")
+    vers["major"] = int(sv[0])
+    vers["minor"] = int(sv[1]) if len(sv) > 1 else 0
+
+    try:
+        vers["patch"] = int(sv[2])
+    except IndexError:
+        vers["patch"] = None
+
+    return OSVersion(**vers)
+
+
+def _system_version_plist() -> Optional[OSVersion]:
+    """Software Version read directly from the SystemVersion.plist file, this is the same source
+    '/usr/bin/sw_vers' uses, without the cost of spawning a process."""
+    vers_attrs_map = {"ProductName": "name",
+                      "ProductVersion": "version",
+                      "ProductBuildVersion": "build",
+                      "ProductVersionExtra": "rsr_version"}
+
+    try:
+        with open(SYSTEM_VERSION, "rb") as f:
+            data = plistlib.load(f)
+    except (OSError, plistlib.InvalidFileException):
+        return None
+
+    vers = {attr: data.get(key) for key, attr in vers_attrs_map.items()}
+    return _os_version(vers) if vers["version"] else None
+
+
+@profiled("subprocess.sw_vers")
 def _sw_vers():  # -> OSVersion:
     """Software Version."""
     vers_attrs_map = {"productname": "name",
                       "productversion": "version",
                       "buildversion": "build",
                       "productversionextra": "rsr_version"}
-    cmd = ["/usr/bin/sw_vers"]
+    cmd = [SW_VERS]
     p = subprocess.run(cmd, capture_output=True, encoding="utf-8")
 
     if p.returncode == 0:
@@ -30,18 +74,26 @@ def _sw_vers():  # -> OSVersion:
             key, val = [x.strip() for x in ln.split(":")]
             vers[vers_attrs_map[key.lower()]] = val
 
-        sv = vers["version"].split(".")
-        vers["major"] = int(sv[0])
-        vers["minor"] = int(sv[1])
+        return _os_version(vers)
+
+
+@lru_cache(maxsize=None)
+def os_version() -> Optional[OSVersion]:
+    """Return the OS version; this is read once per process, from the SystemVersion.plist file if possible,
+    otherwise from '/usr/bin/sw_vers'. Interpreters built against an SDK older than macOS 11 are given the
+    compatibility version '10.16' when they read the file, so '/usr/bin/sw_vers' is used for that too."""
+    try:
+        vers = _system_version_plist()
 
-        try:
-            vers["patch"] = int(sv[2])
-        except IndexError:
-            vers["patch"] = None
+        if vers is None or (vers.major == 10 and vers.minor >= 16):
+            return _sw_vers() or vers
 
-        return OSVersion(**vers)
+        return vers
+    except OSError:
+        return None
 
 
 def major_os_version() -> int:
-    """Return the major OS version."""
-    return _sw_vers().major
+    """Return the major OS version, or 0 if the OS version cannot be determined."""
+    vers = os_version()
+    return vers.major if vers else 0
@@ -0,0 +1,251 @@
+import queue
+import sys
+import threading
+
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+from .backends import get_backend
+from .corewlan import WLan, WLanError
+
+
+# CWEventType values
+EVENT_TYPES = {"power": 1,
+               "ssid": 2,
+               "bssid": 3,
+               "link": 4,
+               "link_quality": 5,
+               "mode": 6,
+               "country_code": 7,
+               "scan_cache": 8}
+DEFAULT_EVENTS = ["ssid", "link", "scan_cache"]
+RUN_LOOP_SLICE = 0.1  # seconds the run loop is run for between checks for events
+
+
+@dataclass
+class WatchEvent:
+    kind: str = field(default=None)
+    interface: str = field(default=None)
+    time: float = field(default_factory=monotonic)
+
+
+class EventSource:
+    """Base class for a source of wireless events; events are passed to the callback given to 'start()'.
+    A source that runs out of events calls the callback with 'None'."""
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    def start(self, callback: Callable[[Optional[WatchEvent]], None]) -> None:
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        pass
+
+    def wait(self, events: queue.Queue, timeout: Optional[int | float] = None) -> Optional[WatchEvent]:
+        """Return the next event put on 'events' by the callback, waiting up to 'timeout' seconds (or forever);
+        raises 'queue.Empty' if no event arrived in time.
+
+        :param events: the queue the callback given to 'start()' puts events on
+        :param timeout: optional number of seconds to wait"""
+        return events.get(timeout=timeout)
+
+
+class CoreWLANEventSource(EventSource):
+    """Wireless events delivered by 'CWWiFiClient' to an event delegate."""
+    def __init__(self, client: Any, events: Optional[List[str]] = None, backend: Optional[Any] = None) -> None:
+        """Initialise.
+
+        :param client: the 'CWWiFiClient' object to monitor events on
+        :param events: list of event names (keys of 'EVENT_TYPES') to monitor, defaults to 'DEFAULT_EVENTS'
+        :param backend: the backend providing the event delegate, defaults to the current backend"""
+        self.events = events or DEFAULT_EVENTS
+        self._client = client
+        self._backend = backend or get_backend()
+        self._delegate = None
+
+    def start(self, callback: Callable[[Optional[WatchEvent]], None]) -> None:
+        def delegate_callback(kind: str, interface: str) -> None:
+            callback(WatchEvent(kind=kind, interface=interface))
+
+        self._delegate = self._backend.event_delegate(delegate_callback)
+        self._client.setDelegate_(self._delegate)
+
+        for event in self.events:
+            success, error = self._client.startMonitoringEventWithType_error_(EVENT_TYPES[event], None)
+
+            if not success:
+                print(f"Error monitoring {event!r} events: {error.domain()!r}, code {error.code()!r}",
+                      file=sys.stderr)
+
+    def wait(self, events: queue.Queue, timeout: Optional[int | float] = None) -> Optional[WatchEvent]:
+        """Return the next event, running the run loop of this thread in short slices while waiting, as CoreWLAN
+        delivers the delegate callbacks through the run loop of the thread that started monitoring events.
+
+        :param events: the queue the callback given to 'start()' puts events on
+        :param timeout: optional number of seconds to wait"""
+        deadline = None if timeout is None else monotonic() + timeout
+
+        while True:
+            try:
+                return events.get_nowait()
+            except queue.Empty:
+                remaining = None if deadline is None else deadline - monotonic()
+
+                if remaining is not None and remaining <= 0:
+                    raise
+
+            self._backend.run_loop(RUN_LOOP_SLICE if remaining is None else min(RUN_LOOP_SLICE, remaining))
+
+    def stop(self) -> None:
+        self._client.stopMonitoringAllEventsAndReturnError_(None)
+        self._client.setDelegate_(None)
+        self._delegate = None
+
+
+class SyntheticEventSource(EventSource):
+    """Replays a list of events from a background thread, for example to drive a 'Watcher' off macOS."""
+    def __init__(self, events: Iterable[Tuple[int | float, str]], interface: Optional[str] = None) -> None:
+        """Initialise.
+
+        :param events: iterable of (delay, kind) tuples; each event is sent 'delay' seconds after the
+                       previous event
+        :param interface: the interface name to send the events for"""
+        self.events = events
+        self.interface = interface
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self, callback: Callable[[Optional[WatchEvent]], None]) -> None:
+        def replay():
+            for delay, kind in self.events:
+                if self._stopped.wait(delay):
+                    return
+
+                callback(WatchEvent(kind=kind, interface=self.interface))
+
+            callback(None)
+
+        self._thread = threading.Thread(target=replay, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+
+class Watcher:
+    """Keeps one 'WLan' object and re-applies a policy order when wireless events arrive.
+
+    Events are debounced: after an event, the watcher waits until no events have arrived for 'debounce'
+    seconds, then applies the policy once. The policy is only committed when the resulting order differs
+    from the current order. If 'interval' is set, the policy is also checked after that many seconds without
+    any events, as changes to the preferred network list do not generate an event."""
+    def __init__(self,
+                 wlan: WLan,
+                 policy: Callable[[WLan], List[str]],
+                 source: EventSource,
+                 debounce: int | float = 2,
+                 interval: Optional[int | float] = None,
+                 use_networksetup: bool = False,
+                 dry_run: bool = False,
+                 output: Any = sys.stdout) -> None:
+        """Initialise.
+
+        :param wlan: the WLan object to apply the policy to
+        :param policy: callable returning the list of SSID names (as strings) in the order to apply
+        :param source: the source of wireless events
+        :param debounce: number of seconds without events before the policy is applied
+        :param interval: optional number of seconds without events before the policy is checked anyway
+        :param use_networksetup: apply changes with 'networksetup' instead of CoreWLAN
+        :param dry_run: print the new order instead of applying it
+        :param output: file object messages are written to"""
+        self.wlan = wlan
+        self.policy = policy
+        self.source = source
+        self.debounce = debounce
+        self.interval = interval
+        self.use_networksetup = use_networksetup
+        self.dry_run = dry_run
+        self.output = output
+        self.commits = 0
+        self._events = queue.Queue()
+
+    def __repr__(self):
+        attrvals = [f"{k}={v!r}" for k, v in self.__dict__.items() if not (k.startswith("_") or k.startswith("__"))]
+        return f"{type(self).__name__}({', '.join(attrvals)})"
+
+    def apply(self) -> bool:
+        """Apply the policy if the order it produces differs from the current order; returns True if a change
+        was applied (or would be applied, when this is a dry run)."""
+        self.wlan.refresh()
+
+        try:
+            new_order = self.wlan.reorder(self.policy(self.wlan))
+
+            if new_order == self.wlan.interface.network_profiles:
+                return False
+
+            if self.dry_run:
+                print("New SSID order:", file=self.output)
+                self.wlan.print_ssid_order(new_order, output=self.output)
+            else:
+                self.wlan.commit(new_order=new_order, use_networksetup=self.use_networksetup)
+        except WLanError:
+            # The watcher keeps running after a failed reorder or commit, and tries again on the next event
+            return False
+
+        self.commits += 1
+        return True
+
+    def run(self, max_commits: Optional[int] = None) -> int:
+        """Apply the policy, then watch for events until the event source runs out of events, 'max_commits'
+        changes have been applied, or the watcher is interrupted. Returns the number of changes applied.
+
+        :param max_commits: optional number of changes to apply before returning"""
+        self.source.start(self._events.put)
+
+        try:
+            self.apply()
+
+            while max_commits is None or self.commits < max_commits:
+                try:
+                    event = self.source.wait(self._events, timeout=self.interval)
+                except queue.Empty:
+                    self.apply()
+                    continue
+
+                if event is None:
+                    break
+
+                self._debounce(event)
+                self.apply()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.source.stop()
+
+        return self.commits
+
+    def _debounce(self, event: WatchEvent) -> None:
+        """Wait until no events have arrived for 'debounce' seconds.
+
+        :param event: the first event of the burst"""
+        events = [event]
+
+        while True:
+            try:
+                event = self.source.wait(self._events, timeout=self.debounce)
+            except queue.Empty:
+                break
+
+            if event is None:
+                self._events.put(None)  # process this burst, then stop
+                break
+
+            events.append(event)
+
+        # Use the scan results CoreWLAN has cached rather than an active scan: a signal based policy would scan,
+        # and every scan (including our own) sends another scan cache event
+        if any(event.kind == "scan_cache" for event in events):
+            self.wlan.load_cached_scan()
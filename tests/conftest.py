@@ -0,0 +1,10 @@
+"""Tests run against the 'fake' backend, so they run without macOS; the backend has to be chosen before the
+models are imported, as they build their lookup tables from the backend constants."""
+import os
+import sys
+
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ["SSIDSHUFFLE_BACKEND"] = "fake"
+os.environ.pop("SSIDSHUFFLE_PROFILE", None)
@@ -0,0 +1,192 @@
+import subprocess
+
+import pytest
+
+from ssidlib.backends.fake import FakeBackend, FakeConfiguration, FakeNetworkProfile
+from ssidlib.corewlan import WLan, WLanError
+from ssidlib.utils import networksetup
+
+
+def ssids(wlan):
+    wlan.refresh()
+    return wlan.interface.profile_index.ssids
+
+
+@pytest.fixture
+def wlan():
+    return WLan(backend=FakeBackend(profiles=6))
+
+
+@pytest.fixture
+def fake_networksetup(monkeypatch):
+    """Run 'networksetup' against the configuration of a fake 'WLan', in process. Returns a function taking the
+    'WLan' object, which returns a dictionary of SSIDs and the number of times adding each of them fails."""
+    def setup(wlan):
+        failing = dict()
+
+        def run(args, binary=None, **kwargs):
+            command, iface, ssid = args[:3]
+            interface = wlan.client.interfaceWithName_(iface)
+            profiles = interface.configuration().networkProfiles().array()
+
+            if command == "-removepreferredwirelessnetwork":
+                profiles = [profile for profile in profiles if not profile.ssid() == ssid]
+                stdout = f"Removed {ssid} from the preferred networks list"
+            elif failing.get(ssid):
+                failing[ssid] -= 1
+                return subprocess.CompletedProcess(args, 1, stdout=f"Error adding {ssid}", stderr="")
+            else:
+                profiles.insert(int(args[3]), FakeNetworkProfile(ssid=ssid, security=0))
+                stdout = f"Added {ssid} to preferred networks list"
+
+            interface._configuration = FakeConfiguration(profiles)
+            return subprocess.CompletedProcess(args, 0, stdout=stdout, stderr="")
+
+        monkeypatch.setattr(networksetup, "_networksetup", run)
+        return failing
+
+    return setup
+
+
+@pytest.fixture
+def duplicates():
+    # 'Network-00002' is saved twice (positions 2 and 3), with different security types (WPA Enterprise, then WPA3
+    # transition mode)
+    return WLan(backend=FakeBackend(profiles=6, duplicate_every=3, seed=1))
+
+
+def test_networksetup_security_map_uses_first_profile(duplicates):
+    interface = duplicates.interface
+    index = interface.profile_index
+    security_map = interface.networksetup_security_types_map
+
+    assert index.positions["Network-00002"] == [2, 3]
+    assert list(security_map) == list(index.positions)
+    assert security_map["Network-00002"] == "WPAE"  # the first profile, the second one is "WPA2"
+
+
+def test_networksetup_commit_refuses_to_move_duplicates(duplicates, capsys):
+    before = duplicates.interface.profile_index.ssids
+
+    with pytest.raises(WLanError):
+        duplicates.commit(duplicates.reorder(["Network-00002"]), use_networksetup=True)
+
+    assert "saved more than once" in capsys.readouterr().err
+    assert duplicates.interface.profile_index.ssids == before
+
+
+def test_scanned_network_expires_with_the_scan_cache():
+    wlan = WLan(backend=FakeBackend(), scan_ttl=30)
+    network = wlan.scan_for_networks()[0]
+
+    assert wlan.scanned_network(network.bssid) is network
+
+    time, networks = wlan._scan_cache[(None, False)]
+    wlan._scan_cache[(None, False)] = (time - 31, networks)  # as if the scan was made 31 seconds ago
+
+    assert wlan.scanned_network(network.bssid) is None
+    assert wlan.scan_for_networks()[0].bssid == network.bssid  # an active scan
+    assert wlan.scanned_network(network.bssid) is not None
+
+
+def test_interface_snapshot_is_cached(wlan):
+    assert wlan.interface is wlan.interface
+
+    snapshot = wlan.interface
+    wlan.refresh()
+
+    assert wlan.interface is not snapshot
+
+
+def test_reorder(wlan):
+    profiles = wlan.reorder(["Network-00003", "Network-00001"])
+
+    assert wlan.interface.profile_index.ssids_for(profiles)[:3] == ["Network-00003", "Network-00001", "Network-00000"]
+
+
+def test_reorder_missing_ssids(wlan, capsys):
+    with pytest.raises(WLanError) as e:
+        wlan.reorder(["Network-00003", "Nope"])
+
+    assert e.value.code == 2
+    assert "'Nope'" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("use_networksetup", [False, True])
+def test_commit(wlan, fake_networksetup, use_networksetup):
+    fake_networksetup(wlan)
+    target = ["Network-00005", "Network-00000", "Network-00002", "Network-00001", "Network-00003", "Network-00004"]
+    wlan.commit(wlan.reorder(target), use_networksetup=use_networksetup)
+
+    assert ssids(wlan) == target
+
+
+def test_commit_rolls_back_when_verify_fails(wlan, monkeypatch, capsys):
+    before = ssids(wlan)
+    iface = wlan.client.interface()
+    commit = iface.commitConfiguration_authorization_error_
+    commits = []
+
+    def ignored_commit(configuration, authorization, error):
+        # The first commit reports success but applies the order in reverse, like a change macOS did not apply
+        commits.append(configuration)
+
+        if len(commits) == 1:
+            configuration = FakeConfiguration(list(reversed(configuration.networkProfiles().array())))
+
+        return commit(configuration, authorization, error)
+
+    monkeypatch.setattr(iface, "commitConfiguration_authorization_error_", ignored_commit)
+
+    with pytest.raises(WLanError):
+        wlan.commit(wlan.reorder(["Network-00004"]))
+
+    assert len(commits) == 2
+    assert ssids(wlan) == before
+    assert "Rolled back" in capsys.readouterr().err
+
+
+def test_commit_failure_is_an_error(wlan, capsys):
+    before = ssids(wlan)
+    wlan.client.interface().commit_error = -3930
+
+    with pytest.raises(WLanError) as e:
+        wlan.commit(wlan.reorder(["Network-00004"]))
+
+    assert e.value.code == 1
+    assert "-3930" in capsys.readouterr().err
+    assert ssids(wlan) == before
+
+
+def test_networksetup_commit_rolls_back_failed_add(wlan, fake_networksetup, capsys):
+    before = ssids(wlan)
+    fake_networksetup(wlan)["Network-00004"] = 1
+
+    with pytest.raises(WLanError):
+        wlan.commit(wlan.reorder(["Network-00003", "Network-00004"]), use_networksetup=True)
+
+    err = capsys.readouterr().err
+    assert "Error adding Network-00004" in err
+    assert "Rolled back" in err
+    assert ssids(wlan) == before
+
+
+def test_networksetup_rollback_reports_lost_ssids(wlan, fake_networksetup, capsys):
+    fake_networksetup(wlan)["Network-00004"] = 2  # the rollback cannot re-add it either
+
+    with pytest.raises(WLanError):
+        wlan.commit(wlan.reorder(["Network-00003", "Network-00004"]), use_networksetup=True)
+
+    err = capsys.readouterr().err
+    assert "Could not roll back" in err
+    assert "'Network-00004'" in err
+
+
+def test_networksetup_commit_with_unmoved_duplicates(fake_networksetup):
+    # 'Network-00002' is saved twice, and does not move
+    wlan = WLan(backend=FakeBackend(profiles=6, duplicate_every=3, seed=1))
+    fake_networksetup(wlan)
+    wlan.commit(wlan.reorder(["Network-00001", "Network-00000", "Network-00005"]), use_networksetup=True)
+
+    assert ssids(wlan) == ["Network-00001", "Network-00000", "Network-00005", "Network-00002", "Network-00002",
+                           "Network-00004"]
@@ -0,0 +1,36 @@
+import sys
+
+import pytest
+
+from ssidlib.backends.fake import FakeBackend
+from ssidlib.corewlan import WLan
+from ssidlib.metrics import MetricsSampler
+from ssidlib.utils import airport
+
+
+@pytest.fixture
+def redacted(monkeypatch):
+    """A connected interface that does not report its BSSID, with an 'airport' fallback that records its calls."""
+    backend = FakeBackend()
+    monkeypatch.setattr(backend.client().interface(), "bssid", lambda: None)
+    monkeypatch.setattr(airport, "AIRPORT", sys.executable)  # any existing path
+    calls = []
+    monkeypatch.setattr(airport, "_airport_getinfo", lambda max_age: calls.append(max_age))
+    return WLan(backend=backend), calls
+
+
+def test_sampler_does_not_use_airport(redacted):
+    wlan, calls = redacted
+    sampler = MetricsSampler(wlan, interval=0)
+    sampler.run(samples=3)
+
+    assert calls == []
+    assert sampler.stats()["samples"] == 3
+    assert sampler.stats()["rssi"]["last"] is not None
+
+
+def test_sampler_uses_airport_when_asked(redacted):
+    wlan, calls = redacted
+    MetricsSampler(wlan, interval=0, use_airport=True).sample()
+
+    assert len(calls) == 1
@@ -0,0 +1,87 @@
+import pytest
+
+from ssidlib.utils.ordering import (longest_increasing_subsequence, minimal_moves, reorder_positions,
+                                    saved_insert_indexes, ssid_positions)
+
+
+def apply_moves(saved, removals, inserts):
+    """Apply the moves the way 'networksetup' does: a removal removes every profile with the SSID name."""
+    result = [ssid for ssid in saved if ssid not in removals]
+
+    for index, ssid in inserts:
+        result.insert(index, ssid)
+
+    return result
+
+
+@pytest.mark.parametrize("saved, target", [(["A", "A", "B", "C"], ["A", "C", "B"]),
+                                           (["A", "B", "A"], ["A", "C", "B"]),
+                                           (["A", "B", "B", "C", "D"], ["D", "A", "B", "C"]),
+                                           (["A", "B", "C"], ["C", "B", "A"])])
+def test_saved_insert_indexes(saved, target):
+    if "C" not in saved:
+        saved = saved + ["C"]
+
+    removals, inserts = minimal_moves(list(dict.fromkeys(saved)), target)
+    result = apply_moves(saved, removals, saved_insert_indexes(saved, removals, inserts))
+
+    assert list(dict.fromkeys(result)) == target
+    assert sorted(result) == sorted(saved)
+
+
+def test_saved_insert_indexes_without_duplicates():
+    removals, inserts = minimal_moves(["A", "B", "C"], ["C", "A", "B"])
+
+    assert saved_insert_indexes(["A", "B", "C"], removals, inserts) == inserts
+
+
+@pytest.mark.parametrize("current, target, moves", [(["A", "B", "C"], ["A", "B", "C"], 0),
+                                                    (["A", "B", "C"], ["C", "A", "B"], 1),
+                                                    (["A", "B", "C", "D"], ["B", "A", "D", "C"], 2),
+                                                    (["A", "B", "C", "D"], ["D", "C", "B", "A"], 3),
+                                                    ([], [], 0)])
+def test_minimal_moves(current, target, moves):
+    removals, inserts = minimal_moves(current, target)
+
+    assert len(removals) == moves
+    assert sorted(removals) == sorted(ssid for _, ssid in inserts)
+    assert [index for index, _ in inserts] == sorted(index for index, _ in inserts)
+    assert apply_moves(current, removals, inserts) == target
+
+
+def test_minimal_moves_moves_one_ssid_to_the_top():
+    assert minimal_moves(["A", "B", "C"], ["C", "A", "B"]) == (["C"], [(0, "C")])
+
+
+def test_minimal_moves_adds_and_removes():
+    removals, inserts = minimal_moves(["A", "B", "C"], ["D", "A", "C"])
+
+    assert removals == ["B"]
+    assert inserts == [(0, "D")]
+    assert apply_moves(["A", "B", "C"], removals, inserts) == ["D", "A", "C"]
+
+
+def test_longest_increasing_subsequence():
+    values = [3, 1, 4, 1, 5, 9, 2, 6]
+    indexes = longest_increasing_subsequence(values)
+
+    assert len(indexes) == 4
+    assert all(values[a] < values[b] for a, b in zip(indexes, indexes[1:]))
+    assert longest_increasing_subsequence([]) == []
+
+
+@pytest.mark.parametrize("ssids, new_order, positions, missing", [
+    (["A", "B", "C"], ["C"], [2, 0, 1], []),
+    (["A", "B", "C"], ["C", "A"], [2, 0, 1], []),
+    (["A", "B", "C"], ["C", "C", "B"], [2, 1, 0], []),
+    (["A", "B", "A", "C"], ["A"], [0, 2, 1, 3], []),  # every profile with the SSID moves, keeping their order
+    (["A", "B", "A", "C"], ["C", "A"], [3, 0, 2, 1], []),
+    (["A", "B", "C"], ["C", "X", "Y", "X"], [], ["X", "Y"]),
+    (["A", "B", "C"], [], [0, 1, 2], [])])
+def test_reorder_positions(ssids, new_order, positions, missing):
+    assert reorder_positions(ssids, new_order) == (positions, missing)
+    assert reorder_positions(ssids, new_order, positions=ssid_positions(ssids)) == (positions, missing)
+
+
+def test_ssid_positions():
+    assert ssid_positions(["A", "B", "A"]) == {"A": [0, 2], "B": [1]}
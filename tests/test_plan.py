@@ -0,0 +1,47 @@
+import json
+
+import pytest
+
+from ssidlib import plan
+
+
+@pytest.fixture
+def exports(tmp_path):
+    (tmp_path / "host1.json").write_text(json.dumps(["A", "B", "C"]))
+    profiles = [{"index": 0, "ssid": "B"}, {"index": 1, "ssid": "C"}]
+    (tmp_path / "host2.json").write_text(json.dumps({"host": "mac2", "interface": "en0", "profiles": profiles}))
+    return tmp_path
+
+
+@pytest.mark.parametrize("argv", [["-s", "C", "A", "-p", "{path}"],
+                                  ["-p", "{path}", "-s", "C", "A"],
+                                  ["--ssids", "C", "A", "--paths", "{path}", "--format", "ndjson"]])
+def test_main_parses_ssids_and_paths(exports, capsys, argv):
+    argv = [arg.format(path=exports) for arg in argv]
+
+    assert plan.main(argv + ["--workers", "1"]) == 1  # 'mac2' is missing 'A'
+
+    out = capsys.readouterr().out
+    assert "host1" in out and "mac2" in out
+
+
+def test_main_requires_paths(capsys):
+    with pytest.raises(SystemExit) as e:
+        plan.main(["-s", "C", "A", "exports"])
+
+    assert e.value.code == 2
+    assert "-p/--paths" in capsys.readouterr().err
+
+
+def test_plan_file(exports):
+    path = exports / "host1.json"
+
+    assert plan.plan_file(path, ["C", "A"]) == [{"host": "host1",
+                                                 "interface": None,
+                                                 "file": str(path),
+                                                 "status": "changed",
+                                                 "missing": [],
+                                                 "moves": ["C"],
+                                                 "current": ["A", "B", "C"],
+                                                 "new": ["C", "A", "B"]}]
+    assert plan.plan_file(exports / "host2.json", ["C", "A"])[0]["missing"] == ["A"]
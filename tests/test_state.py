@@ -0,0 +1,29 @@
+import os
+import stat
+
+from ssidlib.utils import state
+
+
+def test_root_uses_system_state_file(monkeypatch):
+    monkeypatch.delenv(state.STATE_ENV, raising=False)
+    monkeypatch.setattr(os, "geteuid", lambda: 0)
+
+    assert state.AppliedState().path == state.SYSTEM_STATE_FILE
+
+    monkeypatch.setattr(os, "geteuid", lambda: 501)
+
+    assert state.AppliedState().path == state.STATE_FILE
+
+
+def test_record_writes_state_file(tmp_path):
+    path = tmp_path / "ssidshuffle" / "state.json"
+    umask = os.umask(0o022)
+
+    try:
+        state.AppliedState(path).record("en0", "policy", "profiles")
+    finally:
+        os.umask(umask)
+
+    assert stat.S_IMODE(path.stat().st_mode) == state.STATE_FILE_MODE
+    assert state.AppliedState(path).is_applied("en0", "policy", "profiles")
+    assert not state.AppliedState(path).is_applied("en0", "policy", "changed")
@@ -0,0 +1,22 @@
+import pytest
+
+from ssidlib.utils import sysinfo
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    sysinfo.os_version.cache_clear()
+    yield
+    sysinfo.os_version.cache_clear()
+
+
+@pytest.mark.parametrize("plist, sw_vers, major", [("13.2.1", "13.2.1", 13),
+                                                   ("10.16", "13.2.1", 13),
+                                                   ("10.15.7", "13.2.1", 10),
+                                                   (None, "12.6", 12),
+                                                   ("10.16", None, 10)])
+def test_os_version(monkeypatch, plist, sw_vers, major):
+    monkeypatch.setattr(sysinfo, "_system_version_plist", lambda: plist and sysinfo._os_version({"version": plist}))
+    monkeypatch.setattr(sysinfo, "_sw_vers", lambda: sw_vers and sysinfo._os_version({"version": sw_vers}))
+
+    assert sysinfo.major_os_version() == major
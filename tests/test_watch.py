@@ -0,0 +1,34 @@
+import io
+import threading
+
+from ssidlib.backends.fake import FakeBackend
+from ssidlib.corewlan import WLan
+from ssidlib.watch import CoreWLANEventSource, Watcher
+
+
+def test_scan_cache_events_do_not_cause_active_scans():
+    backend = FakeBackend(profiles=10, networks=20)
+    wlan = WLan(backend=backend)
+    iface = backend.client().interface()
+    scan = iface.scanForNetworksWithName_includeHidden_error_
+    scans = []
+
+    def counted_scan(*args):
+        scans.append(args)
+        return scan(*args)  # the fake backend sends a scan cache event for every scan
+
+    iface.scanForNetworksWithName_includeHidden_error_ = counted_scan
+    watcher = Watcher(wlan=wlan,
+                      policy=lambda wlan: wlan.order_by_signal(),
+                      source=CoreWLANEventSource(backend.client(), backend=backend),
+                      debounce=0.05,
+                      output=io.StringIO())
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    thread.join(timeout=1)
+    watcher._events.put(None)  # stops the watcher
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert len(scans) == 1
+    assert watcher.commits == 1